@@ -0,0 +1,36 @@
+"""
+Optional numpy import used by the array based helpers
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (_numpy.py) is part of AsyncSpotify which is released under MIT.                      #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from ._error_message import ErrorMessage
+from .spotify_errors import SpotifyError
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def require_numpy():
+    """
+    Get the numpy module or raise an error if numpy is not installed
+
+    Raises:
+        SpotifyError: If numpy is not installed
+
+    Returns:
+        The numpy module
+    """
+
+    if numpy is None:
+        message = 'This feature requires numpy. Install it with pip install async-spotify[numpy]'
+        raise SpotifyError(ErrorMessage(message=message).__dict__)
+
+    return numpy
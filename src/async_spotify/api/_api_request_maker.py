@@ -8,18 +8,28 @@ The api request handler singleton
 #  You are not allowed to use this code or this file for another project without                   #
 #  linking to the original source.                                                                 #
 # ##################################################################################################
+import asyncio
 import json
 import math
 from collections import deque
+from contextlib import AsyncExitStack
 from json import JSONDecodeError
 from typing import Optional, List, Tuple, Deque, Union
 
-from aiohttp import ClientTimeout, TCPConnector, ClientSession, DummyCookieJar
+from aiohttp import ClientTimeout, TCPConnector, ClientSession, DummyCookieJar, ClientConnectionError
 
 from ._response_status import ResponseStatus
 from .._error_message import ErrorMessage
 from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
-from ..spotify_errors import SpotifyError, TokenExpired, RateLimitExceeded, SpotifyAPIError
+from ..processing.projection import Projection, get_active_projection, are_projections_bypassed
+from ..policies.circuit_breaker import CircuitBreaker
+from ..policies.fair_queue import FairQueue
+from ..policies.hedging_policy import HedgingPolicy
+from ..policies.request_scheduler import RequestScheduler
+from ..policies.retry_policy import RetryPolicy
+from ..policies.timeout_policy import TimeoutPolicy, get_remaining_time
+from ..processing.response_processor import ResponseProcessor
+from ..spotify_errors import SpotifyError, TokenExpired, RateLimitExceeded, SpotifyAPIError, DeadlineExceeded
 from ..token_renew_class import TokenRenewClass
 
 
@@ -31,7 +41,14 @@ class ApiRequestHandler:
 
     def __init__(self, spotify_authorisation_token: SpotifyAuthorisationToken,
                  token_renew_instance: TokenRenewClass,
-                 spotify_api_client):
+                 spotify_api_client,
+                 response_processors: List[ResponseProcessor] = None,
+                 request_scheduler: RequestScheduler = None,
+                 fair_queue: FairQueue = None,
+                 retry_policy: RetryPolicy = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 hedging_policy: HedgingPolicy = None,
+                 timeout_policy: TimeoutPolicy = None):
         """
         Create a new ApiRequestHandler class. The api class should be at least once passed to the constructor of this
         class. Otherwise it will not work.
@@ -40,12 +57,26 @@ class ApiRequestHandler:
             spotify_authorisation_token: The auth token of the api class
             token_renew_instance: An instance of a token renew class
             spotify_api_client: The spotify api client
+            response_processors: Processors which transform every successful response
+            request_scheduler: The scheduler which limits the concurrent requests of priority classes
+            fair_queue: The queue which shares the requests fairly between tenants
+            retry_policy: The policy which retries transient failures
+            circuit_breaker: The circuit breaker which fails fast while too many requests fail
+            hedging_policy: The policy which sends duplicates of slow idempotent requests
+            timeout_policy: The policy which sets the timeouts of every request
         """
 
         self.spotify_authorisation_token: SpotifyAuthorisationToken = spotify_authorisation_token
         self.token_renew_instance: TokenRenewClass = token_renew_instance
         self.__spotify_api_client = spotify_api_client
         self.client_session_list: Optional[Deque[ClientSession]] = deque([])
+        self.response_processors: List[ResponseProcessor] = response_processors or []
+        self.request_scheduler: Optional[RequestScheduler] = request_scheduler
+        self.fair_queue: Optional[FairQueue] = fair_queue
+        self.retry_policy: Optional[RetryPolicy] = retry_policy
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker
+        self.hedging_policy: Optional[HedgingPolicy] = hedging_policy
+        self.timeout_policy: Optional[TimeoutPolicy] = timeout_policy
 
     async def create_new_client(self, request_timeout: int, request_limit: int) -> None:
         """
@@ -101,31 +132,41 @@ class ApiRequestHandler:
         Returns: The spotify api response
         """
 
-        if not self.client_session_list:
-            message = 'You have to create a new client with create_new_client ' \
-                      'before you can make requests to the spotify api.'
-            raise SpotifyError(ErrorMessage(message=message).__dict__)
-
         # Prepare the data for the api request
-        url_params, headers, updated_body = self._prepare_request_parameters(auth_token, query_params, body)
+        url_params, headers, updated_body = self.prepare_request_parameters(auth_token, query_params, body)
 
-        # Round robin so you use a different client for every new request
-        self.client_session_list.rotate(1)
-        client: ClientSession = self.client_session_list[0]
+        return await self.make_prepared_request(method, url, url_params, headers, updated_body, last_try)
 
-        # Make the api response
-        async with client.request(method, url, params=url_params, headers=headers, data=updated_body) as response:
-            response_status = ResponseStatus(response.status)
+    async def make_prepared_request(self,
+                                    method: str,
+                                    url: str,
+                                    url_params: List[Tuple[str, str]],
+                                    headers: dict,
+                                    body: str = None,
+                                    last_try=False) \
+            -> Union[dict, List[bool], None, bool]:
+        """
+        Make a request with parameters which were prepared with `prepare_request_parameters`. Used by bulk operations
+        which prepare all of their requests up front
 
-            # Handle the parsing of the rate limit exceeded response which does not work for some reason
-            response_text: str = await response.text()
-            response_json: dict = {}
-            retry_after: str = response.headers.get('Retry-After', None)
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+            last_try: Check if this is the last try (used if you use a token refresh class)
 
-            try:
-                response_json: dict = json.loads(response_text)
-            except JSONDecodeError:
-                pass
+        Returns: The spotify api response
+        """
+
+        if not self.client_session_list:
+            message = 'You have to create a new client with create_new_client ' \
+                      'before you can make requests to the spotify api.'
+            raise SpotifyError(ErrorMessage(message=message).__dict__)
+
+        response_status, response_json, retry_after = await self._send_before_deadline(method, url, url_params,
+                                                                                      headers, body)
 
         # Expired
         if response_status.code == 401:
@@ -139,7 +180,8 @@ class ApiRequestHandler:
                     self.spotify_authorisation_token.activation_time = auth_token.activation_time
                     self.spotify_authorisation_token.refresh_token = auth_token.refresh_token
 
-                return await self.make_request(method, url, query_params, auth_token, body, last_try=True)
+                headers = {**headers, 'Authorization': f'Bearer {auth_token.access_token}'}
+                return await self.make_prepared_request(method, url, url_params, headers, body, last_try=True)
             else:
                 raise TokenExpired(response_json)
 
@@ -153,11 +195,289 @@ class ApiRequestHandler:
 
         # Check if the response was a success
         if not response_status.success:
-            raise SpotifyAPIError(response_json)
+            raise SpotifyAPIError(response_json, response_status.code)
+
+        # Helpers which read the responses internally need the full responses and an active projection overrides the
+        # projection of the client (like in get_projection)
+        bypass_projections: bool = are_projections_bypassed()
+        active_projection: Optional[Projection] = get_active_projection()
+
+        if active_projection and not bypass_projections:
+            response_json = active_projection(response_json)
+
+        for processor in self.response_processors:
+            if not ((bypass_projections or active_projection) and isinstance(processor, Projection)):
+                response_json = processor(response_json)
 
         return response_json
 
-    def _prepare_request_parameters(self, auth_token: SpotifyAuthorisationToken, query_params: dict, body: dict) \
+    async def _send_before_deadline(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict,
+                                    body: str) -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request and cancel it (including retries and the waits for a slot) if the deadline of the
+        call (if one is active) passes
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        remaining: Optional[float] = get_remaining_time()
+        if remaining is None:
+            return await self._send(method, url, url_params, headers, body)
+
+        message = f'The deadline passed before the request to {url} was answered'
+        if remaining <= 0:
+            raise DeadlineExceeded(ErrorMessage(status=504, message=message).__dict__)
+
+        try:
+            return await asyncio.wait_for(self._send(method, url, url_params, headers, body), remaining)
+        except asyncio.TimeoutError:
+            # A timeout of the request itself is no missed deadline
+            if get_remaining_time() > 0:
+                raise
+            raise DeadlineExceeded(ErrorMessage(status=504, message=message).__dict__) from None
+
+    async def _send(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict, body: str) \
+            -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request and retry transient failures according to the retry policy (if present)
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        if not self.retry_policy:
+            return await self._send_once(method, url, url_params, headers, body)
+
+        self.retry_policy.record_request()
+        attempt: int = 0
+
+        while True:
+            error: Optional[Exception] = None
+            try:
+                response = await self._send_once(method, url, url_params, headers, body)
+            except (ClientConnectionError, asyncio.TimeoutError) as exception:
+                error, reason = exception, type(exception).__name__
+            else:
+                status_code: int = response[0].code
+                if not self.retry_policy.is_retryable_status(status_code):
+                    return response
+                reason = str(status_code)
+
+            # An attempt which would start after the deadline of the call is not made and does not take from the budget
+            delay: float = self.retry_policy.backoff(attempt)
+            remaining: Optional[float] = get_remaining_time()
+            if (remaining is not None and delay >= remaining) or \
+                    not self.retry_policy.should_retry(method, attempt, reason):
+                if error:
+                    raise error
+                return response
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send_once(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict, body: str) \
+            -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request once, if the circuit breaker (if present) lets it through
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        if not self.circuit_breaker:
+            return await self._exchange_in_slot(method, url, url_params, headers, body)
+
+        # Fail fast before the request takes a slot
+        group, probe = self.circuit_breaker.before_request(url)
+        success: Optional[bool] = None
+
+        try:
+            response = await self._exchange_in_slot(method, url, url_params, headers, body)
+            success = response[0].code < 500
+            return response
+        except (ClientConnectionError, asyncio.TimeoutError):
+            success = False
+            raise
+        finally:
+            self.circuit_breaker.record(group, probe, success)
+
+    async def _exchange_in_slot(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict,
+                                body: str) -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request in a slot of the fair queue and the request scheduler (if present)
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        async with AsyncExitStack() as stack:
+            if self.fair_queue:
+                await stack.enter_async_context(self.fair_queue.slot())
+            if self.request_scheduler:
+                await stack.enter_async_context(self.request_scheduler.slot(url))
+
+            if self.hedging_policy and self.hedging_policy.is_hedgeable(method):
+                return await self._hedged_exchange(method, url, url_params, headers, body)
+
+            return await self._exchange(method, url, url_params, headers, body)
+
+    async def _hedged_exchange(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict,
+                               body: str) -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request and send a duplicate with the next client session if the response is slow.
+        The first response wins, the other request is cancelled.
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        delay = self.hedging_policy.delay(url)
+
+        primary = asyncio.ensure_future(self._exchange(method, url, url_params, headers, body))
+        requests = {primary}
+
+        try:
+            done, _ = await asyncio.wait(requests, timeout=delay)
+
+            if not done and self.hedging_policy.try_hedge():
+                requests.add(asyncio.ensure_future(self._exchange(method, url, url_params, headers, body)))
+
+            # The first successful response wins, an error only counts if no request is left
+            while True:
+                done, pending = await asyncio.wait(requests, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((request for request in done if not request.exception()), None)
+                if winner or not pending:
+                    break
+                requests = pending
+
+            if not winner:
+                return done.pop().result()
+
+            # The latency of the hedge would push the percentile down, so the primary is timed from its own start (if
+            # the hedge won, the primary took at least this long)
+            self.hedging_policy.record_latency(url, loop.time() - started, winner is not primary)
+            return winner.result()
+        finally:
+            for request in requests:
+                request.cancel()
+
+    async def _exchange(self, method: str, url: str, url_params: List[Tuple[str, str]], headers: dict, body: str) \
+            -> Tuple[ResponseStatus, dict, Optional[str]]:
+        """
+        Send a prepared request with the next client session
+
+        Args:
+            method: The method that should be used (get, post, put, delete)
+            url: The url the request is going to
+            url_params: The formatted url params
+            headers: The headers of the request
+            body: The formatted body
+
+        Returns:
+            A tuple with the
+                response status
+                response json (empty if the response had no json body)
+                Retry-After header
+        """
+
+        # Round robin so you use a different client for every new request
+        self.client_session_list.rotate(1)
+        client: ClientSession = self.client_session_list[0]
+
+        # The timeout of the session is used if there is no timeout policy
+        request_kwargs: dict = {}
+        if self.timeout_policy:
+            request_kwargs['timeout'] = self.timeout_policy.timeout(url)
+
+        # Make the api response
+        async with client.request(method, url, params=url_params, headers=headers, data=body,
+                                  **request_kwargs) as response:
+            response_status = ResponseStatus(response.status)
+
+            # Handle the parsing of the rate limit exceeded response which does not work for some reason
+            response_text: str = await response.text()
+            response_json: dict = {}
+            retry_after: str = response.headers.get('Retry-After', None)
+
+            try:
+                response_json: dict = json.loads(response_text)
+            except JSONDecodeError:
+                pass
+
+        return response_status, response_json, retry_after
+
+    def get_projection(self) -> Optional[Projection]:
+        """
+        Get the projection which will be applied to the responses of requests made in the current context
+
+        Returns:
+            The projection which is active in the current context or the projection of the client (if present).
+            None if projections are bypassed in the current context
+        """
+
+        if are_projections_bypassed():
+            return None
+
+        active_projection: Optional[Projection] = get_active_projection()
+        if active_projection:
+            return active_projection
+
+        return next((processor for processor in self.response_processors if isinstance(processor, Projection)), None)
+
+    def prepare_request_parameters(self, auth_token: SpotifyAuthorisationToken, query_params: dict, body: dict) \
             -> Tuple[List[Tuple[str, str]], dict, str]:
         """
         Prepare the request parameters for the aiohttp request
@@ -9,11 +9,15 @@ Module with the artists endpoint
 #  linking to the original source.                                                                 #
 # ##################################################################################################
 
-from typing import List
+import asyncio
+from typing import List, AsyncIterator
 
+from .albums import Albums
 from .endpoint import Endpoint
+from .tracks import Track
 from .urls import URLS
 from ...authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ...processing.projection import bypass_projections
 
 
 class Artists(Endpoint):
@@ -144,3 +148,70 @@ class Artists(Endpoint):
         response = await self.api_request_handler.make_request('GET', url, args, auth_token)
 
         return response
+
+    async def get_discography(self, artist_id: str, hydrate_tracks: bool = False,
+                              auth_token: SpotifyAuthorisationToken = None, **kwargs) -> AsyncIterator[dict]:
+        """
+        Get every album of an artist including all of its tracks. The albums are returned as soon as they are
+        complete.
+
+        The album pages are requested in parallel, the albums are hydrated in batches of 20 (which already contain
+        the first 50 tracks) and only the remaining track pages of large albums are requested separately.
+
+        Args:
+            artist_id: The artist id
+            hydrate_tracks: Replace the simplified tracks of the albums with full track objects (batches of 50)
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments of the artist albums endpoint as keyword args (include_groups, market, ...)
+
+        Notes:
+            [https://developer.spotify.com/documentation/web-api/reference/artists/get-artists-albums/](https://developer.spotify.com/documentation/web-api/reference/artists/get-artists-albums/)
+
+        Returns:
+            An async iterator over the full albums. The tracks.items list of every album contains all tracks
+        """
+
+        albums = Albums(self.api_request_handler)
+        tracks = Track(self.api_request_handler)
+        market_args = {'market': kwargs['market']} if 'market' in kwargs else {}
+
+        async def complete_album(album: dict) -> dict:
+            # The album may be shared with an entity store, so the completed album is a copy with a new track page
+            track_page: dict = album['tracks']
+            offsets = range(len(track_page['items']), track_page['total'], 50)
+            pages = await asyncio.gather(*[albums.get_tracks(album['id'], auth_token, limit=50, offset=offset,
+                                                             **market_args) for offset in offsets])
+
+            track_list = track_page['items'] + [track for page in pages for track in page['items']]
+
+            if hydrate_tracks:
+                track_id_list = [track['id'] for track in track_list]
+                responses = await asyncio.gather(*[tracks.get_several(chunk, auth_token, **market_args)
+                                                   for chunk in self._chunks(track_id_list, 50)])
+                track_list = [track for response in responses for track in response['tracks']]
+
+            return {**album, 'tracks': {**track_page, 'items': track_list, 'next': None}}
+
+        async def complete_albums(album_id_list: List[str]) -> List[dict]:
+            response = await albums.get_multiple(album_id_list, auth_token, **market_args)
+            album_list = list(filter(None, response['albums']))
+            return list(await asyncio.gather(*[complete_album(album) for album in album_list]))
+
+        seen_album_ids = set()
+        tasks = []
+
+        try:
+            async for page in self._iterate_pages(self.get_album_list, artist_id, auth_token=auth_token, **kwargs):
+                album_id_list = [album['id'] for album in page['items'] if album['id'] not in seen_album_ids]
+                seen_album_ids.update(album_id_list)
+                # The albums are completed from their track pages, so the tasks are created without projection
+                with bypass_projections():
+                    tasks.extend(asyncio.ensure_future(complete_albums(chunk))
+                                 for chunk in self._chunks(album_id_list, 20))
+
+            for task in asyncio.as_completed(tasks):
+                for album in await task:
+                    yield album
+        finally:
+            for task in tasks:
+                task.cancel()
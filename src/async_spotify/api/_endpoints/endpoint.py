@@ -9,10 +9,12 @@ Abstract class which has to be extended by a endpoint
 #  linking to the original source.                                                                 #
 # ##################################################################################################
 
+import asyncio
 from abc import ABC
-from typing import Tuple
+from typing import Tuple, List, Any, Iterator, AsyncIterator, Callable, Awaitable
 
 from async_spotify.api._api_request_maker import ApiRequestHandler
+from ...processing.projection import bypass_projections
 
 
 class Endpoint(ABC):
@@ -49,3 +51,81 @@ class Endpoint(ABC):
                 map_object.pop(key, None)
 
         return return_url_string, map_object
+
+    @staticmethod
+    def _chunks(item_list: List[Any], chunk_size: int) -> Iterator[List[Any]]:
+        """
+        Split a list into chunks which respect the maximal number of items spotify accepts per request
+
+        Args:
+            item_list: The list which should be split
+            chunk_size: The maximal size of a chunk
+
+        Returns:
+            An iterator over the chunks
+        """
+
+        for start in range(0, len(item_list), chunk_size):
+            yield item_list[start:start + chunk_size]
+
+    @staticmethod
+    async def _iterate_pages(method: Callable[..., Awaitable[dict]], *args, limit: int = 50,
+                             **kwargs) -> AsyncIterator[dict]:
+        """
+        Get every page of a paging endpoint. The first page is requested to get the total number of items, all other
+        pages are requested concurrently and returned in the order they arrive. The pages are not pruned by projections.
+
+        Args:
+            method: The endpoint method which returns the paging object
+            args: The positional arguments of the method
+            limit: The number of items per page
+            kwargs: The keyword arguments of the method
+
+        Returns:
+            An async iterator over the pages
+        """
+
+        # The paging fields are needed, so the pages are requested without projection
+        with bypass_projections():
+            first_page: dict = await method(*args, limit=limit, offset=0, **kwargs)
+            tasks = [asyncio.ensure_future(method(*args, limit=limit, offset=offset, **kwargs))
+                     for offset in range(limit, first_page['total'], limit)]
+
+        yield first_page
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _get_all_items(method: Callable[..., Awaitable[dict]], *args, limit: int = 50,
+                             **kwargs) -> Tuple[List[Any], int]:
+        """
+        Get the items of every page of a paging endpoint in their original order. The first page is requested to get
+        the total number of items, all other pages are requested concurrently. The pages are not pruned by projections.
+
+        Args:
+            method: The endpoint method which returns the paging object
+            args: The positional arguments of the method
+            limit: The number of items per page
+            kwargs: The keyword arguments of the method
+
+        Returns:
+            Tuple(the items of all pages, the number of requests)
+        """
+
+        with bypass_projections():
+            first_page: dict = await method(*args, limit=limit, offset=0, **kwargs)
+
+            pages: List[dict] = await asyncio.gather(
+                *[method(*args, limit=limit, offset=offset, **kwargs)
+                  for offset in range(limit, first_page['total'], limit)])
+
+        items: List[Any] = list(first_page['items'])
+        for page in pages:
+            items.extend(page['items'])
+
+        return items, len(pages) + 1
@@ -8,11 +8,21 @@ Module with the player endpoint
 #  You are not allowed to use this code or this file for another project without                   #
 #  linking to the original source.                                                                 #
 # ##################################################################################################
-from typing import List
+import asyncio
+import time
+from typing import List, Optional, AsyncIterator, Tuple
+
+from aiohttp import ClientConnectionError, ClientConnectorError
 
 from .endpoint import Endpoint
 from .urls import URLS
+from ..._error_message import ErrorMessage
 from ...authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ...policies.retry_policy import RetryPolicy
+from ...policies.timeout_policy import get_remaining_time
+from ...processing.projection import bypass_projections
+from ...spotify_errors import SpotifyBaseError, SpotifyError, SpotifyAPIError, RateLimitExceeded, TokenExpired, \
+    CircuitOpenError, DeadlineExceeded
 
 
 class Player(Endpoint):
@@ -75,9 +85,15 @@ class Player(Endpoint):
         await self.api_request_handler.make_request('POST', URLS.PLAYER.QUEUE, args, auth_token)
 
     async def add_multiple_tracks_to_queue(self, spotify_id_list: List[str],
-                                           auth_token: SpotifyAuthorisationToken = None, **kwargs) -> None:
+                                           auth_token: SpotifyAuthorisationToken = None, retries: int = 2,
+                                           stop_on_error: bool = True, **kwargs) -> List[Optional[SpotifyBaseError]]:
         """
-        Add items to the end of the user’s current playback queue
+        Add items to the end of the user’s current playback queue.
+        The items are queued in strict order. All requests are prepared up front and every request is sent as soon as
+        the previous one was acknowledged. Only failures which show that the item was not queued (server errors, rate
+        limits and failed connects) are retried with the backoff of the retry policy of the client (or the default
+        [`RetryPolicy`][async_spotify.policies.retry_policy.RetryPolicy]). Timeouts are not retried, because the item
+        may have been queued already.
 
         Notes:
             [https://developer.spotify.com/documentation/web-api/reference/player/add-to-queue/](https://developer.spotify.com/documentation/web-api/reference/player/add-to-queue/)
@@ -85,16 +101,34 @@ class Player(Endpoint):
         Args:
             spotify_id_list: A spotify id list of an item
             auth_token: The auth token if you set the api class not to keep the token in memory
+            retries: How often a failure of an item is retried
+            stop_on_error: Do not send the remaining items after an item failed. The remaining items are never sent
+                after an expired token, an open circuit or an exceeded deadline
             kwargs: Optional arguments as keyword args
+
+        Returns:
+            The result of every item: None if it was queued, otherwise the error. Items which were not sent because
+            of a previous error get a SpotifyError
         """
 
-        for spotify_id in spotify_id_list:
-            args: dict = {
-                'uri': spotify_id,
-                **kwargs
-            }
+        # Prepare every request up front, so the next request is sent right after the previous one was acknowledged
+        prepared_list: List[Tuple[List[Tuple[str, str]], dict, str]] = [
+            self.api_request_handler.prepare_request_parameters(auth_token, {'uri': spotify_id, **kwargs}, None)
+            for spotify_id in spotify_id_list]
+        retry_policy: RetryPolicy = self.api_request_handler.retry_policy or RetryPolicy()
+        results: List[Optional[SpotifyBaseError]] = []
 
-            await self.api_request_handler.make_request('POST', URLS.PLAYER.QUEUE, args, auth_token)
+        for index, (url_params, headers, _) in enumerate(prepared_list):
+            error = await self._queue_with_retries(url_params, headers, retries, retry_policy)
+            results.append(error)
+
+            # These errors would fail the remaining items as well
+            if error and (stop_on_error or isinstance(error, (TokenExpired, CircuitOpenError, DeadlineExceeded))):
+                message = f'Not queued, because {spotify_id_list[index]} could not be queued'
+                results.extend(SpotifyError(ErrorMessage(message=message).__dict__) for _ in prepared_list[index + 1:])
+                break
+
+        return results
 
     async def get_recent_tracks(self, auth_token: SpotifyAuthorisationToken = None, **kwargs) -> dict:
         """
@@ -130,6 +164,63 @@ class Player(Endpoint):
 
         return await self.api_request_handler.make_request('GET', URLS.PLAYER.PLAYING, kwargs, auth_token)
 
+    async def watch(self, auth_token: SpotifyAuthorisationToken = None, playing_interval: float = 5,
+                    paused_interval: float = 15, min_interval: float = 1, max_interval: float = 60,
+                    seek_tolerance_ms: int = 3000, **kwargs) -> AsyncIterator[dict]:
+        """
+        Watch the playback of the user by polling the currently playing track adaptively.
+        While a track is playing the next poll is scheduled right after its predicted end (from progress_ms and
+        duration_ms) if that comes before the playing interval. Paused or stopped playback is polled with the paused
+        interval and failed polls (api errors, exceeded deadlines and connection errors) back off exponentially up to
+        the max interval. Exceeded rate limits and open circuits are waited out. An expired token ends the watch.
+
+        Args:
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            playing_interval: The seconds between two polls while a track is playing
+            paused_interval: The seconds between two polls while the playback is paused or stopped
+            min_interval: The minimal seconds between two polls
+            max_interval: The maximal seconds between two polls after errors
+            seek_tolerance_ms: The deviation from the predicted progress which is reported as seek
+            kwargs: Optional arguments of get_current_track as keyword args
+
+        Returns:
+            An async iterator over the changes of the playback. Every change is a dict with the type (track_change,
+            pause, resume, seek or stop), the current state and the previous state
+        """
+
+        previous: Optional[dict] = None
+        polled_at: float = 0
+        errors: int = 0
+
+        while True:
+            try:
+                # The diff needs the full playback state
+                with bypass_projections():
+                    state: dict = await self.get_current_track(auth_token, **kwargs) or {}
+            except (RateLimitExceeded, CircuitOpenError) as error:
+                await asyncio.sleep(max(error.retry_after, min_interval))
+                continue
+            except (SpotifyAPIError, DeadlineExceeded, ClientConnectionError, asyncio.TimeoutError):
+                errors += 1
+                await asyncio.sleep(min(max_interval, playing_interval * 2 ** errors))
+                continue
+
+            errors = 0
+            now = time.monotonic()
+
+            for event_type in self._diff_playback(previous, state, (now - polled_at) * 1000, seek_tolerance_ms):
+                yield {'type': event_type, 'state': state, 'previous': previous}
+
+            previous, polled_at = state, now
+
+            if state.get('is_playing') and state.get('item'):
+                remaining = (state['item']['duration_ms'] - state.get('progress_ms', 0)) / 1000
+                delay = max(min_interval, min(playing_interval, remaining + 0.5))
+            else:
+                delay = paused_interval
+
+            await asyncio.sleep(delay)
+
     async def pause(self, auth_token: SpotifyAuthorisationToken = None, **kwargs) -> None:
         """
         Pause playback on the user’s account
@@ -280,3 +371,95 @@ class Player(Endpoint):
         }
 
         await self.api_request_handler.make_request('PUT', URLS.PLAYER.PLAYER, {}, auth_token, body=body)
+
+    @staticmethod
+    def _diff_playback(previous: Optional[dict], state: dict, elapsed_ms: float, seek_tolerance_ms: int) -> List[str]:
+        """
+        Compare two states of the currently playing track
+
+        Args:
+            previous: The previous state (None before the first poll)
+            state: The current state (empty if nothing is playing)
+            elapsed_ms: The milliseconds between the two polls
+            seek_tolerance_ms: The deviation from the predicted progress which is reported as seek
+
+        Returns:
+            The types of the changes
+        """
+
+        previous_item = (previous or {}).get('item') or {}
+        item = state.get('item') or {}
+
+        if not item:
+            return ['stop'] if previous_item else []
+
+        if item.get('uri') != previous_item.get('uri'):
+            return ['track_change']
+
+        events: List[str] = []
+        if previous['is_playing'] and not state.get('is_playing'):
+            events.append('pause')
+        elif not previous['is_playing'] and state.get('is_playing'):
+            events.append('resume')
+
+        predicted_ms = previous.get('progress_ms', 0) + (elapsed_ms if previous['is_playing'] else 0)
+        if abs(state.get('progress_ms', 0) - predicted_ms) > seek_tolerance_ms + (
+                elapsed_ms if previous['is_playing'] != state.get('is_playing') else 0):
+            events.append('seek')
+
+        return events
+
+    async def _queue_with_retries(self, url_params: List[Tuple[str, str]], headers: dict, retries: int,
+                                  retry_policy: RetryPolicy) -> Optional[SpotifyBaseError]:
+        """
+        Add one item to the queue and retry the failures which show that the item was not queued. Timeouts and lost
+        connections are not retried, because the request may have queued the item already
+
+        Args:
+            url_params: The prepared url params of the request
+            headers: The prepared headers of the request
+            retries: How often a failure is retried
+            retry_policy: The policy which decides about the status codes and the backoff
+
+        Returns:
+            None if the item was queued, otherwise the error
+        """
+
+        for attempt in range(retries + 1):
+            try:
+                await self.api_request_handler.make_prepared_request('POST', URLS.PLAYER.QUEUE, url_params, headers)
+                return None
+            except RateLimitExceeded as error:
+                if attempt == retries or not self._wait_fits_deadline(error.retry_after):
+                    return error
+                await asyncio.sleep(error.retry_after)
+            except SpotifyAPIError as error:
+                delay = retry_policy.backoff(attempt)
+                if attempt == retries or not retry_policy.is_retryable_status(error.status) or \
+                        not self._wait_fits_deadline(delay):
+                    return error
+                await asyncio.sleep(delay)
+            except ClientConnectorError as error:
+                # The connection could not be established, so the request never reached spotify
+                delay = retry_policy.backoff(attempt)
+                if attempt == retries or not self._wait_fits_deadline(delay):
+                    return SpotifyError(ErrorMessage(message=f'{type(error).__name__}: {error}').__dict__)
+                await asyncio.sleep(delay)
+            except (ClientConnectionError, asyncio.TimeoutError) as error:
+                return SpotifyError(ErrorMessage(message=f'{type(error).__name__}: {error}').__dict__)
+            except SpotifyBaseError as error:
+                # Expired token, open circuit or exceeded deadline
+                return error
+
+    @staticmethod
+    def _wait_fits_deadline(delay: float) -> bool:
+        """
+        Args:
+            delay: The seconds which would be waited before the next attempt
+
+        Returns:
+            If the next attempt would start before the deadline of the call (if one is active)
+        """
+
+        remaining: Optional[float] = get_remaining_time()
+        return remaining is None or delay < remaining
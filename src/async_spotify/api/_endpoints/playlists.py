@@ -9,12 +9,20 @@ Module with the playlists endpoint
 #  linking to the original source.                                                                 #
 # ##################################################################################################
 
+import asyncio
 import base64
-from typing import List, Dict, Any, Union
+import math
+from typing import List, Dict, Any, Union, Optional, Callable, Tuple
+
+from aiohttp import ClientConnectionError
 
 from .endpoint import Endpoint
 from .urls import URLS
+from .._playlist_planning import plan_playlist_edit, plan_playlist_moves
 from ...authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ...processing.projection import bypass_projections
+from ...spotify_errors import SpotifyBaseError, PartialWriteError, SpotifyError
+from ..._error_message import ErrorMessage
 
 
 class Playlists(Endpoint):
@@ -23,30 +31,31 @@ class Playlists(Endpoint):
     """
 
     async def add_tracks(self, playlist_id: str, spotify_uris: List[str], position: int = None,
-                         auth_token: SpotifyAuthorisationToken = None) -> None:
+                         auth_token: SpotifyAuthorisationToken = None) -> dict:
         """
         Add one or more tracks to a user’s playlist.
+        Lists with more than 100 uris are written in consecutive requests of 100 uris which keep the order.
 
         Notes:
             [https://developer.spotify.com/documentation/web-api/reference/playlists/add-tracks-to-playlist/](https://developer.spotify.com/documentation/web-api/reference/playlists/add-tracks-to-playlist/)
 
         Args:
             position: The position to insert the items, a zero-based index. Appended if omitted
-            spotify_uris: A list of spotify uris
+            spotify_uris: A list of spotify uris (any length)
             playlist_id: The id of the playlist
             auth_token: The auth token if you set the api class not to keep the token in memory
-        """
 
-        body = {
-            'uris': spotify_uris
-        }
+        Raises:
+            PartialWriteError: If a request failed after at least one request was successful (the original error is
+                the cause). Contains the number of uris which were added before. If the first request fails its error
+                is raised unchanged
 
-        if position is not None:
-            body['position'] = position
+        Returns:
+            A json with the snapshot_id of the playlist after the last request
+        """
 
         url, _ = self._add_url_params(URLS.PLAYLIST.ADD_TRACKS, {'playlist_id': playlist_id})
-
-        await self.api_request_handler.make_request('POST', url, {}, auth_token, body=body)
+        return await self._write_chunks(url, spotify_uris, position, auth_token)
 
     async def change_details(self, playlist_id: str, auth_token: SpotifyAuthorisationToken = None, **kwargs) -> None:
         """
@@ -135,6 +144,8 @@ class Playlists(Endpoint):
             A Playlist
         """
 
+        self._add_projection_fields(kwargs, ['tracks'])
+
         url, _ = self._add_url_params(URLS.PLAYLIST.ONE, {'playlist_id': playlist_id})
         return await self.api_request_handler.make_request('GET', url, kwargs, auth_token)
 
@@ -172,12 +183,14 @@ class Playlists(Endpoint):
             The cover image
         """
 
+        self._add_projection_fields(kwargs, [''])
+
         args = {**{'playlist_id': playlist_id}, **kwargs}
         url, args = self._add_url_params(URLS.PLAYLIST.TRACKS, args)
         return await self.api_request_handler.make_request('GET', url, args, auth_token)
 
     async def remove_tracks(self, playlist_id: str, spotify_uris: Dict[str, List[Dict[str, Any]]],
-                            auth_token: SpotifyAuthorisationToken = None) -> None:
+                            auth_token: SpotifyAuthorisationToken = None) -> dict:
         """
         Remove one or more items from a user’s playlist.
 
@@ -186,13 +199,16 @@ class Playlists(Endpoint):
 
         Args:
             playlist_id: The id of the playlist
-            spotify_uris: A dict with a list of spotify uris in the tracks key
+            spotify_uris: A dict with a list of spotify uris in the tracks key (and optionally a snapshot_id)
             auth_token: The auth token if you set the api class not to keep the token in memory
+
+        Returns:
+            A json with the snapshot_id
         """
 
         url, _ = self._add_url_params(URLS.PLAYLIST.ADD_TRACKS, {'playlist_id': playlist_id})
 
-        await self.api_request_handler.make_request('DELETE', url, {}, auth_token, body=spotify_uris)
+        return await self.api_request_handler.make_request('DELETE', url, {}, auth_token, body=spotify_uris)
 
     async def reorder_tracks(self, playlist_id: str, position_dict: Dict[str, Union[int, str]], snapshot_id: str = None,
                              auth_token: SpotifyAuthorisationToken = None) -> dict:
@@ -221,27 +237,146 @@ class Playlists(Endpoint):
         return await self.api_request_handler.make_request('PUT', url, {}, auth_token, body=body)
 
     async def replace_tracks(self, playlist_id: str, spotify_uris: List[str],
-                             auth_token: SpotifyAuthorisationToken = None) -> None:
+                             auth_token: SpotifyAuthorisationToken = None) -> dict:
         """
         Replace all the items in a playlist, overwriting its existing items. This powerful request can be useful for
         replacing items, re-ordering existing items, or clearing the playlist.
+        Lists with more than 100 uris are written by replacing the playlist with the first 100 uris and appending the
+        rest in consecutive requests of 100 uris.
 
         Notes:
             [https://developer.spotify.com/documentation/web-api/reference/playlists/replace-playlists-tracks/](https://developer.spotify.com/documentation/web-api/reference/playlists/replace-playlists-tracks/)
 
         Args:
-            spotify_uris: A list of spotify uris
+            spotify_uris: A list of spotify uris (any length)
             playlist_id: The id of the playlist
             auth_token: The auth token if you set the api class not to keep the token in memory
-        """
 
-        body = {
-            'uris': spotify_uris
-        }
+        Raises:
+            PartialWriteError: If a request failed after at least one request was successful (the original error is
+                the cause). Contains the number of uris which were written before. If the first request fails its
+                error is raised unchanged
+
+        Returns:
+            A json with the snapshot_id of the playlist after the last request
+        """
 
         url, _ = self._add_url_params(URLS.PLAYLIST.ADD_TRACKS, {'playlist_id': playlist_id})
 
-        await self.api_request_handler.make_request('PUT', url, {}, auth_token, body=body)
+        first_chunk, remaining_uris = spotify_uris[:100], spotify_uris[100:]
+
+        response = await self.api_request_handler.make_request('PUT', url, {}, auth_token, body={'uris': first_chunk})
+        if not remaining_uris:
+            return response
+
+        return await self._write_chunks(url, remaining_uris, None, auth_token, completed=len(first_chunk),
+                                        snapshot_id=response.get('snapshot_id'))
+
+    async def sort(self, playlist_id: str, key: Callable[[dict], Any], reverse: bool = False,
+                   auth_token: SpotifyAuthorisationToken = None, **kwargs) -> dict:
+        """
+        Sort the items of a playlist with as few reorder requests as possible.
+        The items on a longest increasing subsequence of the current order stay where they are, only the remaining items
+        are moved. Items which are adjacent and consecutive in the sorted order are moved together as one range.
+        Because the items are only moved their added_at timestamp is preserved.
+
+        Args:
+            playlist_id: The id of the playlist
+            key: A function which gets a playlist item (as returned by get_tracks) and returns the sort key
+            reverse: Sort in descending order. Items with an equal key keep their relative order in both directions
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments for fetching the items (e.g. fields or market) as keyword args
+
+        Raises:
+            SpotifyError: If the playlist changed while its items were read
+
+        Returns:
+            A json with the snapshot_id after the last move, the number of moved ranges and the number of api_calls
+            which were used
+        """
+
+        with bypass_projections():
+            snapshot_id, items, read_calls = await self._get_items_with_snapshot(playlist_id, auth_token, **kwargs)
+
+            order: List[int] = sorted(range(len(items)), key=lambda index: key(items[index]), reverse=reverse)
+            ranks: List[int] = [0] * len(items)
+            for rank, index in enumerate(order):
+                ranks[index] = rank
+
+            moves = plan_playlist_moves(ranks)
+
+            for range_start, range_length, insert_before in moves:
+                response = await self.reorder_tracks(playlist_id, {'range_start': range_start,
+                                                                   'range_length': range_length,
+                                                                   'insert_before': insert_before},
+                                                     snapshot_id, auth_token)
+                snapshot_id = response['snapshot_id']
+
+            return {
+                'snapshot_id': snapshot_id,
+                'moved': len(moves),
+                'api_calls': read_calls + len(moves)
+            }
+
+    async def sync(self, playlist_id: str, desired_uris: List[str],
+                   auth_token: SpotifyAuthorisationToken = None) -> dict:
+        """
+        Bring a playlist into the desired state with as few write requests as possible.
+        The current items are fetched with concurrent page requests and diffed against the desired uris. Items which
+        are not desired are removed by position, items which are out of order are moved (items on a longest increasing
+        subsequence stay where they are) and missing items are inserted in contiguous runs. Every write is made
+        against the snapshot of the previous write.
+
+        Args:
+            playlist_id: The id of the playlist
+            desired_uris: The uris the playlist should contain in the desired order (any length)
+            auth_token: The auth token if you set the api class not to keep the token in memory
+
+        Raises:
+            SpotifyError: If the playlist contains items without uri (unavailable tracks) or changed while its items
+                were read
+            PartialWriteError: If an insertion failed. Contains the number of uris which were added before
+
+        Returns:
+            A json with the snapshot_id after the last write, the number of removed, moved and added items,
+            the number of api_calls which were used and the number of replace_api_calls a full replace would have used
+        """
+
+        with bypass_projections():
+            snapshot_id, items, read_calls = await self._get_items_with_snapshot(playlist_id, auth_token,
+                                                                                 fields='items(track(uri))')
+
+            if any(not item.get('track') for item in items):
+                raise SpotifyError(ErrorMessage(
+                    message=f'The playlist {playlist_id} contains unavailable items which cannot be synced').__dict__)
+
+            plan = plan_playlist_edit([item['track']['uri'] for item in items], desired_uris)
+
+            for chunk in self._chunks(plan.removals, 100):
+                tracks = [{'uri': uri, 'positions': [position]} for uri, position in chunk]
+                response = await self.remove_tracks(playlist_id, {'tracks': tracks, 'snapshot_id': snapshot_id},
+                                                    auth_token)
+                snapshot_id = response['snapshot_id']
+
+            for range_start, range_length, insert_before in plan.moves:
+                response = await self.reorder_tracks(playlist_id, {'range_start': range_start,
+                                                                   'range_length': range_length,
+                                                                   'insert_before': insert_before},
+                                                     snapshot_id, auth_token)
+                snapshot_id = response['snapshot_id']
+
+            for position, uris in plan.insertions:
+                response = await self.add_tracks(playlist_id, uris, position, auth_token)
+                snapshot_id = response['snapshot_id']
+
+            return {
+                'snapshot_id': snapshot_id,
+                'removed': len(plan.removals),
+                'moved': len(plan.moves),
+                'added': sum(len(uris) for _, uris in plan.insertions),
+                'api_calls': read_calls + plan.api_calls,
+                'replace_api_calls': max(1, math.ceil(len(desired_uris) / 100))
+            }
 
     async def upload_cover(self, playlist_id: str, base_64_image: base64,
                            auth_token: SpotifyAuthorisationToken = None) -> None:
@@ -260,3 +395,127 @@ class Playlists(Endpoint):
 
         url, _ = self._add_url_params(URLS.PLAYLIST.COVER, {'playlist_id': playlist_id})
         await self.api_request_handler.make_request('PUT', url, {}, auth_token, base_64_image)
+
+    async def _get_items_with_snapshot(self, playlist_id: str, auth_token: SpotifyAuthorisationToken,
+                                       fields: str = None, **kwargs) -> Tuple[str, List[dict], int]:
+        """
+        Get all items of a playlist and the snapshot id they belong to. The snapshot id and the first page are read
+        from the same response, the other pages are requested concurrently. If there are other pages the snapshot id
+        is read again afterwards, so writes are never planned against items of another snapshot.
+
+        Args:
+            playlist_id: The id of the playlist
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            fields: The fields of the items paging object (e.g. items(track(uri))). The total is always requested
+            kwargs: Optional arguments for fetching the items (e.g. market) as keyword args
+
+        Raises:
+            SpotifyError: If the playlist changed while its items were read
+
+        Returns:
+            Tuple(the snapshot id, the items of the playlist, the number of requests)
+        """
+
+        page_kwargs: dict = dict(kwargs)
+        if fields:
+            page_kwargs['fields'] = fields if 'total' in fields.split(',') else f'{fields},total'
+
+        playlist_fields = f"snapshot_id,tracks({page_kwargs['fields']})" if fields else 'snapshot_id,tracks'
+        playlist: dict = await self.get_one(playlist_id, auth_token, fields=playlist_fields, **kwargs)
+        snapshot_id: str = playlist['snapshot_id']
+        first_page: dict = playlist['tracks']
+
+        pages: List[dict] = await asyncio.gather(
+            *[self.get_tracks(playlist_id, auth_token, limit=100, offset=offset, **page_kwargs)
+              for offset in range(len(first_page['items']), first_page['total'], 100)])
+
+        items: List[dict] = list(first_page['items'])
+        for page in pages:
+            items.extend(page['items'])
+
+        if not pages:
+            return snapshot_id, items, 1
+
+        playlist = await self.get_one(playlist_id, auth_token, fields='snapshot_id')
+        if playlist['snapshot_id'] != snapshot_id:
+            raise SpotifyError(ErrorMessage(
+                message=f'The playlist {playlist_id} changed while its items were read, try again').__dict__)
+
+        return snapshot_id, items, len(pages) + 2
+
+    async def _write_chunks(self, url: str, spotify_uris: List[str], position: Optional[int],
+                            auth_token: SpotifyAuthorisationToken, completed: int = 0,
+                            snapshot_id: str = None) -> dict:
+        """
+        Add uris to a playlist in consecutive requests of 100 uris
+
+        Args:
+            url: The url of the playlist tracks
+            spotify_uris: The uris which should be added
+            position: The position of the first uri (appended if None)
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            completed: The number of uris which were already written by the caller (used for the error)
+            snapshot_id: The snapshot id after the writes of the caller
+
+        Raises:
+            PartialWriteError: If a request failed after uris were written. Other errors are raised unchanged
+
+        Returns:
+            A json with the snapshot_id of the playlist after the last request
+        """
+
+        response: dict = {'snapshot_id': snapshot_id}
+
+        for chunk in self._chunks(spotify_uris, 100) if spotify_uris else [[]]:
+            body: dict = {'uris': chunk}
+
+            if position is not None:
+                body['position'] = position
+                position += len(chunk)
+
+            try:
+                response = await self.api_request_handler.make_request('POST', url, {}, auth_token, body=body)
+            except (SpotifyBaseError, ClientConnectionError, asyncio.TimeoutError) as error:
+                # Nothing was written yet, so the caller gets the original error
+                if not completed:
+                    raise
+                raise self._partial_write_error(error, completed, response.get('snapshot_id')) from error
+
+            completed += len(chunk)
+
+        return response
+
+    @staticmethod
+    def _partial_write_error(error: Exception, completed: int, snapshot_id: Optional[str]) -> PartialWriteError:
+        """
+        Wrap the error of a write request
+
+        Args:
+            error: The error of the request (api, rate limit, token, circuit, deadline or connection error)
+            completed: The number of uris which were written before
+            snapshot_id: The snapshot id after the last successful request
+
+        Returns:
+            The partial write error
+        """
+
+        if isinstance(error, SpotifyBaseError):
+            message = error.get_json()
+        else:
+            message = ErrorMessage(message=f'{type(error).__name__}: {error}').__dict__
+
+        return PartialWriteError(message, completed, snapshot_id, getattr(error, 'retry_after', None),
+                                 getattr(error, 'status', None))
+
+    def _add_projection_fields(self, kwargs: dict, paging_paths: List[str]) -> None:
+        """
+        Request only the fields of the active projection from spotify, if no fields were passed explicitly
+
+        Args:
+            kwargs: The query params of the request
+            paging_paths: The paths of the paging objects in the response
+        """
+
+        projection = self.api_request_handler.get_projection()
+        if projection and 'fields' not in kwargs:
+            kwargs['fields'] = projection.fields(paging_paths)
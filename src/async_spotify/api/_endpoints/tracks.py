@@ -8,11 +8,15 @@ Module with the albums endpoint
 #  You are not allowed to use this code or this file for another project without                   #
 #  linking to the original source.                                                                 #
 # ##################################################################################################
+import asyncio
 from typing import List
 
 from .endpoint import Endpoint
 from .urls import URLS
+from ...audio.audio_analysis import AudioAnalysis
+from ...audio.audio_features import AudioFeatures
 from ...authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ...processing.projection import bypass_projections
 
 
 class Track(Endpoint):
@@ -38,6 +42,26 @@ class Track(Endpoint):
         url, _ = self._add_url_params(URLS.TRACKS.ANALYZE, {'id': track_id})
         return await self.api_request_handler.make_request('GET', url, {}, auth_token)
 
+    async def audio_analyze_arrays(self, track_id: str, auth_token: SpotifyAuthorisationToken = None) \
+            -> AudioAnalysis:
+        """
+        Get the audio analysis of a track converted to contiguous numpy arrays (requires numpy).
+        The segments, sections, bars, beats and tatums are accessible as structured arrays which need a fraction of
+        the memory of the json response.
+
+        Notes:
+            [https://developer.spotify.com/documentation/web-api/reference/tracks/get-audio-analysis/](https://developer.spotify.com/documentation/web-api/reference/tracks/get-audio-analysis/)
+
+        Args:
+            track_id: The spotify track id
+            auth_token: The auth token if you set the api class not to keep the token in memory
+
+        Returns:
+            The audio analysis as arrays
+        """
+
+        return AudioAnalysis(await self.audio_analyze(track_id, auth_token))
+
     async def audio_features(self, track_id: str, auth_token: SpotifyAuthorisationToken = None) -> dict:
         """
         Get audio feature information for a single track identified by its unique Spotify ID.
@@ -75,6 +99,30 @@ class Track(Endpoint):
         return await self.api_request_handler.make_request(
             'GET', URLS.TRACKS.MULTI_FEATURES, {'ids': track_id_list}, auth_token)
 
+    async def audio_features_matrix(self, track_id_list: List[str],
+                                    auth_token: SpotifyAuthorisationToken = None) -> AudioFeatures:
+        """
+        Get the audio features of any number of tracks as column oriented numpy arrays (requires numpy).
+        The ids are split into chunks of 100 which are requested concurrently.
+
+        Notes:
+            [https://developer.spotify.com/documentation/web-api/reference/tracks/get-several-audio-features/](https://developer.spotify.com/documentation/web-api/reference/tracks/get-several-audio-features/)
+
+        Args:
+            track_id_list: A list of spotify ids (can be longer than 100)
+            auth_token: The auth token if you set the api class not to keep the token in memory
+
+        Returns:
+            The audio features of all tracks
+        """
+
+        with bypass_projections():
+            responses = await asyncio.gather(*[self.several_audio_features(chunk, auth_token)
+                                               for chunk in self._chunks(track_id_list, 100)])
+
+        feature_list = [feature for response in responses for feature in response['audio_features']]
+        return AudioFeatures(track_id_list, feature_list)
+
     async def get_several(self, track_id_list: List[str], auth_token: SpotifyAuthorisationToken = None, **kwargs) -> dict:
         """
         Get Spotify catalog information for multiple tracks based on their Spotify IDs.
@@ -0,0 +1,174 @@
+"""
+Computes the requests which transform a playlist into a desired order with as few writes as possible
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (_playlist_planning.py) is part of AsyncSpotify which is released under MIT.          #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import bisect
+import math
+from collections import defaultdict, deque
+from typing import List, Tuple, Dict, Deque, Set
+
+
+class PlaylistEditPlan:
+    """
+    The edit script which transforms the current items of a playlist into the desired items
+    """
+
+    def __init__(self):
+        self.removals: List[Tuple[str, int]] = []
+        """ The (uri, position) of every item which has to be removed in descending position order """
+
+        self.moves: List[Tuple[int, int, int]] = []
+        """ The (range_start, range_length, insert_before) of the reorder requests in the order they are applied """
+
+        self.insertions: List[Tuple[int, List[str]]] = []
+        """ The (position, uris) of the add requests in the order they are applied """
+
+    @property
+    def api_calls(self) -> int:
+        """
+        Returns:
+            The number of write requests needed to apply the plan
+        """
+
+        return (math.ceil(len(self.removals) / 100) + len(self.moves)
+                + sum(math.ceil(len(uris) / 100) for _, uris in self.insertions))
+
+
+def longest_increasing_subsequence(sequence: List[int]) -> Set[int]:
+    """
+    Compute a longest strictly increasing subsequence in O(n log n)
+
+    Args:
+        sequence: The sequence
+
+    Returns:
+        The indices of the elements of the subsequence
+    """
+
+    tail_values: List[int] = []
+    tail_indices: List[int] = []
+    predecessors: List[int] = []
+
+    for index, value in enumerate(sequence):
+        position = bisect.bisect_left(tail_values, value)
+        predecessors.append(tail_indices[position - 1] if position else -1)
+
+        if position == len(tail_values):
+            tail_values.append(value)
+            tail_indices.append(index)
+        else:
+            tail_values[position] = value
+            tail_indices[position] = index
+
+    result: Set[int] = set()
+    index = tail_indices[-1] if tail_indices else -1
+    while index != -1:
+        result.add(index)
+        index = predecessors[index]
+
+    return result
+
+
+def plan_playlist_moves(ranks: List[int]) -> List[Tuple[int, int, int]]:
+    """
+    Plan the reorder requests which sort the items of a playlist by their rank. The items on a longest increasing
+    subsequence stay where they are, all other items are moved. Items which are adjacent in the playlist and
+    consecutive in the target order are moved together as one range.
+
+    Args:
+        ranks: The unique target rank of every item in the current order of the playlist
+
+    Returns:
+        The (range_start, range_length, insert_before) of the reorder requests in the order they have to be applied
+    """
+
+    stable = longest_increasing_subsequence(ranks)
+    placed: List[int] = sorted(ranks[index] for index in stable)
+    ordered: List[int] = sorted(ranks)
+    successor: Dict[int, int] = dict(zip(ordered, ordered[1:]))
+
+    moves: List[Tuple[int, int, int]] = []
+    playlist: List[int] = list(ranks)
+    moved: Set[int] = set(ranks[index] for index in stable)
+
+    for target in ordered:
+        if target in moved:
+            continue
+
+        # Extend the range with the following items if they are also consecutive in the target order
+        start = playlist.index(target)
+        length = 1
+        while (start + length < len(playlist) and playlist[start + length] not in moved
+               and playlist[start + length] == successor.get(playlist[start + length - 1])):
+            length += 1
+
+        block = playlist[start:start + length]
+        del playlist[start:start + length]
+
+        # Insert before the first placed item which comes after the range in the target order
+        following = bisect.bisect_right(placed, target)
+        destination = playlist.index(placed[following]) if following < len(placed) else len(playlist)
+        playlist[destination:destination] = block
+
+        for rank in block:
+            bisect.insort(placed, rank)
+            moved.add(rank)
+
+        moves.append((start, length, destination if destination <= start else destination + length))
+
+    return moves
+
+
+def plan_playlist_edit(current_uris: List[str], desired_uris: List[str]) -> PlaylistEditPlan:
+    """
+    Plan the removals, moves and insertions which transform the current playlist into the desired one.
+    Every occurrence of a uri in the current playlist is matched with the occurrence of the same rank in the desired
+    playlist, unmatched items are removed. The matched items are reordered with plan_playlist_moves and missing items
+    are inserted in contiguous runs.
+
+    Args:
+        current_uris: The uris of the current playlist
+        desired_uris: The uris of the desired playlist
+
+    Returns:
+        The edit plan
+    """
+
+    plan = PlaylistEditPlan()
+
+    desired_positions: Dict[str, Deque[int]] = defaultdict(deque)
+    for position, uri in enumerate(desired_uris):
+        desired_positions[uri].append(position)
+
+    # Match the current items with the desired positions
+    kept: List[int] = []
+    for position, uri in enumerate(current_uris):
+        if desired_positions[uri]:
+            kept.append(desired_positions[uri].popleft())
+        else:
+            plan.removals.append((uri, position))
+
+    plan.removals.reverse()
+
+    plan.moves = plan_playlist_moves(kept)
+
+    # Insert the missing items in contiguous runs
+    present: Set[int] = set(kept)
+    run_start = None
+    for position in range(len(desired_uris) + 1):
+        missing = position < len(desired_uris) and position not in present
+
+        if missing and run_start is None:
+            run_start = position
+        elif not missing and run_start is not None:
+            plan.insertions.append((run_start, desired_uris[run_start:position]))
+            run_start = None
+
+    return plan
@@ -39,6 +39,13 @@ from ..authentification.authorization_flows.authorization_flow import Authorizat
 from ..authentification.authorization_flows.client_credentials_flow import ClientCredentialsFlow
 from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
 from ..authentification.spotify_cookies import SpotifyCookie
+from ..policies.circuit_breaker import CircuitBreaker
+from ..policies.fair_queue import FairQueue
+from ..policies.hedging_policy import HedgingPolicy
+from ..policies.timeout_policy import TimeoutPolicy
+from ..policies.request_scheduler import RequestScheduler
+from ..policies.retry_policy import RetryPolicy
+from ..processing.response_processor import ResponseProcessor
 from ..spotify_errors import SpotifyError
 from ..token_renew_class import TokenRenewClass
 
@@ -51,7 +58,14 @@ class SpotifyApiClient:
     def __init__(self, authorization_flow: AuthorizationFlow,
                  hold_authentication=False,
                  spotify_authorisation_token: SpotifyAuthorisationToken = None,
-                 token_renew_instance: TokenRenewClass = None):
+                 token_renew_instance: TokenRenewClass = None,
+                 response_processors: List[ResponseProcessor] = None,
+                 request_scheduler: RequestScheduler = None,
+                 fair_queue: FairQueue = None,
+                 retry_policy: RetryPolicy = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 hedging_policy: HedgingPolicy = None,
+                 timeout_policy: TimeoutPolicy = None):
         """
         Create a new api class
 
@@ -59,6 +73,22 @@ class SpotifyApiClient:
             authorization_flow: The auth_code_flow object fully filled with information
             hold_authentication: Should the api keep the authentication im memory and refresh it automatically
             token_renew_instance: An instance of a class which handles the renewing of the token if it should expire
+            response_processors: Instances of [`ResponseProcessor`][async_spotify.processing.response_processor]
+                which transform every successful api response (for example the
+                [`MarketCompactor`][async_spotify.processing.market_mask.MarketCompactor])
+            request_scheduler: A [`RequestScheduler`][async_spotify.policies.request_scheduler] which limits the
+                concurrent requests per priority class, so interactive calls are not queued behind bulk calls
+            fair_queue: A [`FairQueue`][async_spotify.policies.fair_queue] which shares the requests fairly between
+                the tenants of a multi-tenant application
+            retry_policy: A [`RetryPolicy`][async_spotify.policies.retry_policy] which retries transient failures
+                (server errors, connection errors and timeouts) with jittered exponential backoff
+            circuit_breaker: A [`CircuitBreaker`][async_spotify.policies.circuit_breaker] which fails fast with a
+                [`CircuitOpenError`][async_spotify.spotify_errors.CircuitOpenError] while too many requests fail
+            hedging_policy: A [`HedgingPolicy`][async_spotify.policies.hedging_policy] which sends a duplicate of
+                slow GET requests to cut the tail latency
+            timeout_policy: A [`TimeoutPolicy`][async_spotify.policies.timeout_policy] which sets the connect, socket
+                read and total timeout of every request per endpoint group (instead of the `request_timeout` of the
+                client session)
         """
 
         # Check if the auth_code_flow are valid
@@ -75,7 +105,10 @@ class SpotifyApiClient:
         self._token_renew_instance: TokenRenewClass = token_renew_instance
         self._hold_authentication: bool = hold_authentication
         self._api_request_handler: ApiRequestHandler = ApiRequestHandler(self._spotify_authorisation_token,
-                                                                         token_renew_instance, self)
+                                                                         token_renew_instance, self,
+                                                                         response_processors, request_scheduler,
+                                                                         fair_queue, retry_policy, circuit_breaker,
+                                                                         hedging_policy, timeout_policy)
 
         ################################################################################################################
         self.albums: Albums = Albums(self._api_request_handler)
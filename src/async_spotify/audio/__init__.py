@@ -0,0 +1,14 @@
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (__init__.py) is part of AsyncSpotify which is released under MIT.                    #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+"""
+Array based helpers for the audio analysis and audio features of tracks (requires numpy)
+"""
+
+from .audio_analysis import AudioAnalysis
+from .audio_features import AudioFeatures
+from .similarity_index import SimilarityIndex
@@ -0,0 +1,200 @@
+"""
+Compact numpy representation of the spotify audio analysis
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (audio_analysis.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import List, Optional
+
+from .._numpy import require_numpy
+
+
+def _column(items: List[dict], key: str, dtype, default: float = float('nan')) -> 'numpy.ndarray':
+    """
+    Collect one value of every item into a contiguous array
+
+    Args:
+        items: The items of the analysis (bars, segments, ...)
+        key: The key of the value
+        dtype: The dtype of the array
+        default: The value used if an item does not have the key
+
+    Returns:
+        The values as one dimensional array
+    """
+
+    np = require_numpy()
+    return np.fromiter((item.get(key, default) for item in items), dtype=dtype, count=len(items))
+
+
+class TimeIntervals:
+    """
+    Time intervals of an audio analysis (bars, beats and tatums) stored as arrays
+    """
+
+    def __init__(self, items: List[dict]):
+        """
+        Create new time intervals
+
+        Args:
+            items: The intervals as returned by the spotify api
+        """
+
+        np = require_numpy()
+
+        self.start: np.ndarray = _column(items, 'start', np.float64)
+        """ The starting point (in seconds) of every interval """
+
+        self.duration: np.ndarray = _column(items, 'duration', np.float64)
+        """ The duration (in seconds) of every interval """
+
+        self.confidence: np.ndarray = _column(items, 'confidence', np.float32)
+        """ The confidence, from 0.0 to 1.0, of the reliability of every interval """
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        Get a single interval in the format of the spotify api
+
+        Args:
+            index: The index of the interval
+
+        Returns:
+            The interval as dict
+        """
+
+        return {name: value[index].tolist() for name, value in vars(self).items()}
+
+    @property
+    def end(self) -> 'numpy.ndarray':
+        """
+        Returns:
+            The end point (in seconds) of every interval
+        """
+
+        return self.start + self.duration
+
+    def index_at(self, seconds: float) -> Optional[int]:
+        """
+        Get the index of the interval which contains a specific point in time
+
+        Args:
+            seconds: The point in time in seconds
+
+        Returns:
+            The index of the interval or None if no interval contains the point in time
+        """
+
+        np = require_numpy()
+
+        index = int(np.searchsorted(self.start, seconds, side='right')) - 1
+        if index < 0 or seconds >= self.end[index]:
+            return None
+
+        return index
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            The number of bytes used by the arrays
+        """
+
+        return sum(value.nbytes for value in vars(self).values())
+
+
+class Sections(TimeIntervals):
+    """
+    The sections of an audio analysis stored as arrays
+    """
+
+    def __init__(self, items: List[dict]):
+        """
+        Create new sections
+
+        Args:
+            items: The sections as returned by the spotify api
+        """
+
+        super().__init__(items)
+        np = require_numpy()
+
+        self.loudness: np.ndarray = _column(items, 'loudness', np.float32)
+        self.tempo: np.ndarray = _column(items, 'tempo', np.float32)
+        self.tempo_confidence: np.ndarray = _column(items, 'tempo_confidence', np.float32)
+        self.key: np.ndarray = _column(items, 'key', np.int8, -1)
+        self.key_confidence: np.ndarray = _column(items, 'key_confidence', np.float32)
+        self.mode: np.ndarray = _column(items, 'mode', np.int8, -1)
+        self.mode_confidence: np.ndarray = _column(items, 'mode_confidence', np.float32)
+        self.time_signature: np.ndarray = _column(items, 'time_signature', np.int8, -1)
+        self.time_signature_confidence: np.ndarray = _column(items, 'time_signature_confidence', np.float32)
+
+
+class Segments(TimeIntervals):
+    """
+    The segments of an audio analysis stored as arrays.
+    The pitches and the timbre are stored as two dimensional array with the shape (number of segments, 12).
+    """
+
+    def __init__(self, items: List[dict]):
+        """
+        Create new segments
+
+        Args:
+            items: The segments as returned by the spotify api
+        """
+
+        super().__init__(items)
+        np = require_numpy()
+
+        self.loudness_start: np.ndarray = _column(items, 'loudness_start', np.float32)
+        self.loudness_max: np.ndarray = _column(items, 'loudness_max', np.float32)
+        self.loudness_max_time: np.ndarray = _column(items, 'loudness_max_time', np.float32)
+        self.loudness_end: np.ndarray = _column(items, 'loudness_end', np.float32)
+        self.pitches: np.ndarray = np.array([item['pitches'] for item in items], dtype=np.float32).reshape(-1, 12)
+        self.timbre: np.ndarray = np.array([item['timbre'] for item in items], dtype=np.float32).reshape(-1, 12)
+
+
+class AudioAnalysis:
+    """
+    The audio analysis of a track with all the intervals converted to contiguous numpy arrays.
+    This uses a fraction of the memory the parsed json needs and allows vectorized computations.
+    """
+
+    def __init__(self, analysis: dict):
+        """
+        Convert an audio analysis
+
+        Args:
+            analysis: The audio analysis as returned by the spotify api
+        """
+
+        self.meta: dict = analysis.get('meta', {})
+        """ The meta information of the analysis """
+
+        self.track: dict = {key: value for key, value in analysis.get('track', {}).items()
+                            if not key.endswith('string')}
+        """ The track level information (tempo, key, ...) without the large fingerprint strings """
+
+        self.bars: TimeIntervals = TimeIntervals(analysis.get('bars', []))
+        self.beats: TimeIntervals = TimeIntervals(analysis.get('beats', []))
+        self.tatums: TimeIntervals = TimeIntervals(analysis.get('tatums', []))
+        self.sections: Sections = Sections(analysis.get('sections', []))
+        self.segments: Segments = Segments(analysis.get('segments', []))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            The number of bytes used by the arrays of the analysis
+        """
+
+        return sum(intervals.nbytes for intervals in
+                   [self.bars, self.beats, self.tatums, self.sections, self.segments])
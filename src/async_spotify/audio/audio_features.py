@@ -0,0 +1,148 @@
+"""
+Column oriented representation of the audio features of many tracks
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (audio_features.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import List, Dict, Optional
+
+from .._numpy import require_numpy
+
+FEATURE_COLUMNS: List[str] = ['danceability', 'energy', 'key', 'loudness', 'mode', 'speechiness', 'acousticness',
+                              'instrumentalness', 'liveness', 'valence', 'tempo', 'duration_ms', 'time_signature']
+""" The numeric columns of the audio features """
+
+
+class AudioFeatures:
+    """
+    The audio features of several tracks stored column wise as numpy arrays.
+    Every column has one value for every track id, tracks without audio features are NaN and marked in the
+    missing mask.
+    """
+
+    def __init__(self, track_id_list: List[str], feature_list: List[Optional[dict]]):
+        """
+        Convert the audio features
+
+        Args:
+            track_id_list: The track ids in the order of the features
+            feature_list: The audio features as returned by the spotify api (None for missing tracks)
+        """
+
+        np = require_numpy()
+
+        self.ids: List[str] = list(track_id_list)
+        """ The track ids in the order of the rows """
+
+        self._index: Dict[str, int] = {track_id: index for index, track_id in enumerate(self.ids)}
+
+        self.missing: np.ndarray = np.fromiter((feature is None for feature in feature_list), dtype=bool,
+                                               count=len(feature_list))
+        """ True for every track spotify returned no audio features for """
+
+        self.columns: Dict[str, np.ndarray] = {
+            column: np.fromiter((feature.get(column, np.nan) if feature else np.nan for feature in feature_list),
+                                dtype=np.float64, count=len(feature_list))
+            for column in FEATURE_COLUMNS
+        }
+        """ The audio features by column name """
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, column: str) -> 'numpy.ndarray':
+        """
+        Get a column of the audio features
+
+        Args:
+            column: The name of the column (danceability, energy, ...)
+
+        Returns:
+            The values of the column
+        """
+
+        return self.columns[column]
+
+    def index_of(self, track_id_list: List[str]) -> 'numpy.ndarray':
+        """
+        Get the row indices of several tracks
+
+        Args:
+            track_id_list: The track ids
+
+        Returns:
+            The row indices of the tracks
+        """
+
+        np = require_numpy()
+        return np.fromiter((self._index[track_id] for track_id in track_id_list), dtype=np.int64,
+                           count=len(track_id_list))
+
+    def row(self, track_id: str) -> Dict[str, float]:
+        """
+        Get the audio features of a single track
+
+        Args:
+            track_id: The track id
+
+        Returns:
+            The audio features of the track
+        """
+
+        index = self._index[track_id]
+        return {column: float(values[index]) for column, values in self.columns.items()}
+
+    def to_structured_array(self) -> 'numpy.ndarray':
+        """
+        Returns:
+            The audio features as numpy structured array with an id field
+        """
+
+        np = require_numpy()
+
+        id_length = max((len(track_id) for track_id in self.ids), default=1)
+        dtype = [('id', f'U{id_length}')] + [(column, np.float64) for column in FEATURE_COLUMNS]
+        array = np.empty(len(self.ids), dtype=dtype)
+        array['id'] = self.ids
+
+        for column, values in self.columns.items():
+            array[column] = values
+
+        return array
+
+    def summary(self, track_id_list: List[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Compute summary statistics of every column. Missing tracks are ignored.
+
+        Args:
+            track_id_list: Only use these tracks (for example the tracks of a playlist). All tracks if omitted
+
+        Returns:
+            The mean, std, min, median and max of every column
+        """
+
+        np = require_numpy()
+
+        rows = self.index_of(track_id_list) if track_id_list is not None else slice(None)
+
+        summary = {}
+        for column in FEATURE_COLUMNS:
+            values = self.columns[column][rows]
+            values = values[~np.isnan(values)]
+            summary[column] = {'count': int(values.size)}
+
+            if values.size:
+                summary[column].update({
+                    'mean': float(values.mean()),
+                    'std': float(values.std()),
+                    'min': float(values.min()),
+                    'median': float(np.median(values)),
+                    'max': float(values.max()),
+                })
+
+        return summary
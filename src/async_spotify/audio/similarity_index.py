@@ -0,0 +1,228 @@
+"""
+Local nearest neighbour index over the audio features of tracks
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (similarity_index.py) is part of AsyncSpotify which is released under MIT.            #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import List, Dict, Tuple
+
+from .._numpy import require_numpy
+from .audio_features import AudioFeatures
+
+SIMILARITY_COLUMNS: Dict[str, Tuple[float, float]] = {
+    'danceability': (0, 1),
+    'energy': (0, 1),
+    'speechiness': (0, 1),
+    'acousticness': (0, 1),
+    'instrumentalness': (0, 1),
+    'liveness': (0, 1),
+    'valence': (0, 1),
+    'tempo': (0, 250),
+    'loudness': (-60, 0),
+}
+""" The default columns of the index with the value range used to scale them to [0, 1] """
+
+
+class SimilarityIndex:
+    """
+    An in memory k nearest neighbour index over audio feature vectors.
+    The features are scaled with fixed value ranges, so tracks can be inserted incrementally without rebuilding the
+    index. Queries are exact and computed as vectorized matrix operations over chunks of queries, so the memory of a
+    query stays bounded at any index size.
+    """
+
+    def __init__(self, columns: Dict[str, Tuple[float, float]] = None, initial_capacity: int = 1024,
+                 max_query_distances: int = 1 << 22):
+        """
+        Create a new empty index
+
+        Args:
+            columns: The feature columns and their (min, max) value range. Defaults to `SIMILARITY_COLUMNS`
+            initial_capacity: The number of tracks the index can hold before the first resize
+            max_query_distances: The maximal number of distances (queries x tracks) which are computed at once.
+                The default needs about 16 MB per distance matrix
+        """
+
+        np = require_numpy()
+
+        columns = columns or SIMILARITY_COLUMNS
+        self.columns: List[str] = list(columns)
+        self._offset: np.ndarray = np.array([value_range[0] for value_range in columns.values()], dtype=np.float32)
+        self._scale: np.ndarray = np.array([value_range[1] - value_range[0] for value_range in columns.values()],
+                                           dtype=np.float32)
+
+        self.max_query_distances: int = max_query_distances
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._matrix: np.ndarray = np.empty((max(initial_capacity, 1), len(self.columns)), dtype=np.float32)
+        self._norms: np.ndarray = np.empty(max(initial_capacity, 1), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self._index
+
+    def add(self, features: AudioFeatures) -> None:
+        """
+        Add or update the tracks of the audio features. Tracks without features are skipped.
+
+        Args:
+            features: The audio features of the tracks
+        """
+
+        np = require_numpy()
+
+        rows = np.flatnonzero(~features.missing)
+        vectors = np.column_stack([features[column][rows] for column in self.columns])
+        self.add_vectors([features.ids[row] for row in rows], vectors)
+
+    def add_vectors(self, track_id_list: List[str], vectors: 'numpy.ndarray') -> None:
+        """
+        Add or update raw feature vectors
+
+        Args:
+            track_id_list: The ids of the tracks
+            vectors: The unscaled feature vectors with one column for every column of the index
+        """
+
+        np = require_numpy()
+
+        vectors = self._normalize(vectors)
+
+        for track_id, vector in zip(track_id_list, vectors):
+            row = self._index.get(track_id)
+
+            if row is None:
+                row = len(self._ids)
+                self._ensure_capacity(row + 1)
+                self._index[track_id] = row
+                self._ids.append(track_id)
+
+            self._matrix[row] = vector
+            self._norms[row] = np.dot(vector, vector)
+
+    def nearest(self, track_id_list: List[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Get the most similar tracks for tracks which are already part of the index
+
+        Args:
+            track_id_list: The ids of the tracks
+            k: The number of similar tracks per track
+
+        Returns:
+            For every track a list of (track id, distance) tuples ordered by distance. The track itself is excluded
+        """
+
+        rows = [self._index[track_id] for track_id in track_id_list]
+        neighbours = self._query(self._matrix[rows], k + 1)
+
+        return [[(track_id, distance) for track_id, distance in result if track_id != own_id][:k]
+                for own_id, result in zip(track_id_list, neighbours)]
+
+    def nearest_to_vectors(self, vectors: 'numpy.ndarray', k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Get the most similar tracks for arbitrary feature vectors (for example the features of a track which is not
+        part of the index or a target profile)
+
+        Args:
+            vectors: The unscaled feature vectors with one column for every column of the index
+            k: The number of similar tracks per vector
+
+        Returns:
+            For every vector a list of (track id, distance) tuples ordered by distance
+        """
+
+        return self._query(self._normalize(vectors), k)
+
+    def _query(self, queries: 'numpy.ndarray', k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Compute the exact k nearest neighbours of normalized query vectors
+
+        Args:
+            queries: The normalized query vectors
+            k: The number of neighbours
+
+        Returns:
+            For every query a list of (track id, distance) tuples ordered by distance
+        """
+
+        np = require_numpy()
+
+        size = len(self._ids)
+        k = min(k, size)
+        if not k:
+            return [[] for _ in range(len(queries))]
+
+        matrix = self._matrix[:size]
+        norms = self._norms[:size]
+        chunk_size = max(1, self.max_query_distances // size)
+        results: List[List[Tuple[str, float]]] = []
+
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+
+            # Computed in place, so only one distance matrix of the chunk exists at a time
+            distances = chunk @ matrix.T
+            distances *= -2
+            distances += norms[None, :]
+            distances += np.einsum('ij,ij->i', chunk, chunk)[:, None]
+            np.maximum(distances, 0, out=distances)
+
+            candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+            del distances
+
+            order = np.argsort(candidate_distances, axis=1)
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            candidate_distances = np.sqrt(np.take_along_axis(candidate_distances, order, axis=1))
+
+            results.extend([[(self._ids[row], float(distance)) for row, distance in zip(rows, row_distances)]
+                            for rows, row_distances in zip(candidates, candidate_distances)])
+
+        return results
+
+    def _normalize(self, vectors: 'numpy.ndarray') -> 'numpy.ndarray':
+        """
+        Scale feature vectors to the [0, 1] range of the index
+
+        Args:
+            vectors: The unscaled feature vectors
+
+        Returns:
+            The scaled vectors
+        """
+
+        np = require_numpy()
+
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return np.nan_to_num((vectors - self._offset) / self._scale, nan=0.5)
+
+    def _ensure_capacity(self, size: int) -> None:
+        """
+        Grow the backing arrays (doubling the capacity) so they can hold at least size tracks
+
+        Args:
+            size: The required number of rows
+        """
+
+        np = require_numpy()
+
+        capacity = len(self._matrix)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        matrix = np.empty((capacity, len(self.columns)), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[:len(self._ids)] = self._norms[:len(self._ids)]
+
+        self._matrix, self._norms = matrix, norms
@@ -0,0 +1,18 @@
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (__init__.py) is part of AsyncSpotify which is released under MIT.                    #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+"""
+Policies which control how requests are sent to the spotify api
+"""
+
+from .endpoint_groups import ENDPOINT_GROUPS, get_endpoint_group
+from .request_scheduler import RequestScheduler, PriorityClass
+from .fair_queue import FairQueue, Tenant
+from .retry_policy import RetryPolicy
+from .circuit_breaker import CircuitBreaker, Circuit
+from .hedging_policy import HedgingPolicy
+from .timeout_policy import TimeoutPolicy, DEFAULT_GROUP_TIMEOUTS, deadline, get_remaining_time
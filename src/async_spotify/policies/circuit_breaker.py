@@ -0,0 +1,185 @@
+"""
+Circuit breaker which fails fast while the spotify api keeps failing
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (circuit_breaker.py) is part of AsyncSpotify which is released under MIT.             #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import time
+from collections import deque
+from typing import Dict, Deque, Tuple, Optional
+
+from .endpoint_groups import get_endpoint_group
+from .._error_message import ErrorMessage
+from ..spotify_errors import CircuitOpenError
+
+
+class Circuit:
+    """
+    The state of the requests of one endpoint group
+    """
+
+    def __init__(self):
+        self.state: str = 'closed'
+        """ closed (requests are sent), open (requests fail fast) or half_open (only probe requests are sent) """
+
+        self.opened_at: float = 0
+        self.outcomes: Deque[Tuple[float, bool]] = deque()
+        self.probes: int = 0
+        self.successful_probes: int = 0
+
+        self.rejected: int = 0
+        """ The number of requests which failed fast """
+
+        self.opened: int = 0
+        """ How often the circuit was opened """
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint group while too many of its requests fail.
+
+    The outcome of every request is recorded in a sliding window. A response with a server error status, a connection
+    error or a timeout is a failure. If at least `minimum_requests` were made in the window and the failure rate
+    reaches the threshold the circuit opens, every request fails immediately with a
+    [`CircuitOpenError`][async_spotify.spotify_errors.CircuitOpenError]. After `open_duration` the circuit is half
+    open and lets `half_open_probes` concurrent probe requests through. It closes again when all of them succeeded
+    and opens again if one of them failed.
+    """
+
+    def __init__(self, failure_threshold: float = 0.5, minimum_requests: int = 20, window: float = 30,
+                 open_duration: float = 15, half_open_probes: int = 3, per_group: bool = True):
+        """
+        Create a new circuit breaker
+
+        Args:
+            failure_threshold: The share of failed requests in the window which opens the circuit
+            minimum_requests: The minimal number of requests in the window before the circuit can open
+            window: The seconds of the sliding window
+            open_duration: The seconds the circuit stays open before probe requests are sent
+            half_open_probes: The number of probe requests which have to succeed to close the circuit
+            per_group: Use one circuit per [endpoint group][async_spotify.policies.endpoint_groups] instead of one
+                circuit for all requests
+        """
+
+        self.failure_threshold: float = failure_threshold
+        self.minimum_requests: int = minimum_requests
+        self.window: float = window
+        self.open_duration: float = open_duration
+        self.half_open_probes: int = half_open_probes
+        self.per_group: bool = per_group
+
+        self.circuits: Dict[str, Circuit] = {}
+        """ The circuit of every endpoint group (or only all) """
+
+    def before_request(self, url: str) -> Tuple[str, bool]:
+        """
+        Check if a request may be sent
+
+        Args:
+            url: The url of the request
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all probe requests of the half open circuit are running
+
+        Returns:
+            Tuple(the group of the circuit, if the request is a probe request)
+        """
+
+        group = get_endpoint_group(url) if self.per_group else 'all'
+        circuit = self.circuits.setdefault(group, Circuit())
+        now = time.monotonic()
+
+        if circuit.state == 'open' and now - circuit.opened_at >= self.open_duration:
+            circuit.state = 'half_open'
+            circuit.probes = circuit.successful_probes = 0
+
+        if circuit.state == 'closed':
+            return group, False
+
+        if circuit.state == 'half_open' and circuit.probes + circuit.successful_probes < self.half_open_probes:
+            circuit.probes += 1
+            return group, True
+
+        circuit.rejected += 1
+        retry_after = max(0.0, circuit.opened_at + self.open_duration - now)
+        message = f'The circuit of the endpoint group {group} is open, because too many requests failed'
+        raise CircuitOpenError(ErrorMessage(status=503, message=message).__dict__, group, retry_after)
+
+    def record(self, group: str, probe: bool, success: Optional[bool]) -> None:
+        """
+        Record the outcome of a request
+
+        Args:
+            group: The group of the circuit
+            probe: If the request was a probe request
+            success: If the request succeeded. None if it was cancelled
+        """
+
+        circuit = self.circuits[group]
+
+        if probe:
+            circuit.probes -= 1
+            if success is None or circuit.state != 'half_open':
+                return
+
+            if success:
+                circuit.successful_probes += 1
+                if circuit.successful_probes >= self.half_open_probes:
+                    circuit.state = 'closed'
+                    circuit.outcomes.clear()
+            else:
+                self._open(circuit)
+            return
+
+        if success is None or circuit.state != 'closed':
+            return
+
+        now = time.monotonic()
+        circuit.outcomes.append((now, success))
+        while circuit.outcomes and circuit.outcomes[0][0] < now - self.window:
+            circuit.outcomes.popleft()
+
+        if len(circuit.outcomes) >= self.minimum_requests:
+            failures = sum(1 for _, outcome in circuit.outcomes if not outcome)
+            if failures / len(circuit.outcomes) >= self.failure_threshold:
+                self._open(circuit)
+
+    def state(self, group: str = 'all') -> str:
+        """
+        Args:
+            group: The endpoint group (all if the breaker is not per endpoint group)
+
+        Returns:
+            The state of the circuit (closed, open or half_open)
+        """
+
+        circuit = self.circuits.get(group)
+        return circuit.state if circuit else 'closed'
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        Returns:
+            The state, the number of fast failed requests and how often the circuit was opened for every group
+        """
+
+        return {group: {'state': circuit.state, 'rejected': circuit.rejected, 'opened': circuit.opened}
+                for group, circuit in self.circuits.items()}
+
+    @staticmethod
+    def _open(circuit: Circuit) -> None:
+        """
+        Open a circuit
+
+        Args:
+            circuit: The circuit
+        """
+
+        circuit.state = 'open'
+        circuit.opened_at = time.monotonic()
+        circuit.opened += 1
+        circuit.outcomes.clear()
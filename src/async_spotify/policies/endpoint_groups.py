@@ -0,0 +1,52 @@
+"""
+Classification of api urls into groups of endpoints with similar traffic
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (endpoint_groups.py) is part of AsyncSpotify which is released under MIT.             #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import List
+from urllib.parse import urlparse
+
+from ..api._endpoints.urls import BASE_URL
+
+API_PATH: str = urlparse(BASE_URL).path
+
+ENDPOINT_GROUPS: List[str] = ['player', 'user', 'library', 'playlists', 'catalog']
+"""
+The endpoint groups:
+    player: The playback of the user (/me/player)
+    user: The profile, followed artists and users and the top items of users
+    library: The saved tracks, albums and shows of the user
+    playlists: Playlists and their items
+    catalog: Everything else (tracks, albums, artists, shows, episodes, search, browse, ...)
+"""
+
+
+def get_endpoint_group(url: str) -> str:
+    """
+    Get the endpoint group of an url
+
+    Args:
+        url: The url of the request
+
+    Returns:
+        One of the [ENDPOINT_GROUPS](#async_spotify.policies.endpoint_groups.ENDPOINT_GROUPS)
+    """
+
+    path = urlparse(url).path
+    path = path[len(API_PATH):] if path.startswith(API_PATH) else path
+
+    if path.startswith('/me/player'):
+        return 'player'
+    if path.startswith(('/me/tracks', '/me/albums', '/me/shows')):
+        return 'library'
+    if path.startswith(('/playlists', '/me/playlists')) or (path.startswith('/users/') and '/playlists' in path):
+        return 'playlists'
+    if path == '/me' or path.startswith(('/me/', '/users/')):
+        return 'user'
+    return 'catalog'
@@ -0,0 +1,254 @@
+"""
+Weighted fair queuing of the requests of tenants which share one client
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (fair_queue.py) is part of AsyncSpotify which is released under MIT.                  #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Deque, Iterator, AsyncIterator
+
+from .._error_message import ErrorMessage
+from ..spotify_errors import SpotifyError
+
+_active_tenant: ContextVar = ContextVar('active_tenant', default='default')
+
+
+class Tenant:
+    """
+    The queue and the statistics of one tenant
+    """
+
+    def __init__(self, name: str, weight: float, concurrency: int):
+        """
+        Create a new tenant
+
+        Args:
+            name: The name of the tenant
+            weight: The share of the requests the tenant gets relative to the other tenants
+            concurrency: The maximal number of concurrent requests of the tenant
+        """
+
+        self.name: str = name
+        self.weight: float = weight
+        self.concurrency: int = concurrency
+
+        self.running: int = 0
+        """ The number of running requests """
+
+        self.sent: int = 0
+        """ The number of requests which were allowed to run """
+
+        self.waited: float = 0
+        """ The total seconds requests of the tenant waited in the queue """
+
+        self.waiting: Deque[asyncio.Future] = deque()
+        self.deficit: float = 0
+        self.in_round: bool = False
+
+    @property
+    def queued(self) -> int:
+        """
+        Returns:
+            The number of requests waiting in the queue (the queue depth)
+        """
+
+        return len(self.waiting)
+
+    @property
+    def average_wait(self) -> float:
+        """
+        Returns:
+            The average seconds a request of the tenant waited in the queue
+        """
+
+        return self.waited / self.sent if self.sent else 0
+
+
+class FairQueue:
+    """
+    Shares the requests of a [`SpotifyApiClient`][async_spotify.api.spotify_api_client] fairly between tenants.
+
+    Every tenant has its own queue and the free slots are given to the tenants with deficit round robin, so every
+    tenant with waiting requests gets a share of the requests which is proportional to its weight, no matter how many
+    requests it queued. The requests made inside `with fair_queue.tenant(name): ...` belong to the tenant `name`, all
+    other requests belong to the tenant `default`.
+    """
+
+    def __init__(self, weights: Dict[str, float] = None, concurrency: Dict[str, int] = None,
+                 default_weight: float = 1, default_concurrency: int = 10, max_concurrency: int = 50):
+        """
+        Create a new fair queue
+
+        Args:
+            weights: The weight of tenants which should not get the default weight (greater than 0)
+            concurrency: The maximal number of concurrent requests of tenants which should not get the default
+            default_weight: The weight of all other tenants (greater than 0)
+            default_concurrency: The maximal number of concurrent requests of all other tenants
+            max_concurrency: The maximal number of concurrent requests of all tenants
+        """
+
+        for name, weight in {**(weights or {}), 'default_weight': default_weight}.items():
+            self._check_weight(name, weight)
+
+        self.weights: Dict[str, float] = weights or {}
+        self.concurrency: Dict[str, int] = concurrency or {}
+        self.default_weight: float = default_weight
+        self.default_concurrency: int = default_concurrency
+        self.max_concurrency: int = max_concurrency
+        self.running: int = 0
+
+        self.tenants: Dict[str, Tenant] = {}
+        """ Every tenant which made a request """
+
+        self._active: Deque[Tenant] = deque()
+
+    @contextmanager
+    def tenant(self, name: str) -> Iterator[None]:
+        """
+        Make every request which is made inside the with block (in the current task) for a tenant
+
+        Args:
+            name: The name of the tenant
+        """
+
+        token = _active_tenant.set(name)
+        try:
+            yield
+        finally:
+            _active_tenant.reset(token)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Tenant]:
+        """
+        Wait for a free slot of the current tenant and hold it while the with block runs
+
+        Returns:
+            The tenant of the request
+        """
+
+        tenant = self._get_tenant(_active_tenant.get())
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        queued_at = loop.time()
+
+        if not tenant.waiting and tenant not in self._active:
+            self._active.append(tenant)
+        tenant.waiting.append(future)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(tenant)
+            elif future in tenant.waiting:
+                tenant.waiting.remove(future)
+            raise
+
+        tenant.waited += loop.time() - queued_at
+
+        try:
+            yield tenant
+        finally:
+            self._release(tenant)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            The queue depth, running and sent requests and the average wait time of every tenant
+        """
+
+        return {name: {'queued': tenant.queued, 'running': tenant.running, 'sent': tenant.sent,
+                       'average_wait': tenant.average_wait}
+                for name, tenant in self.tenants.items()}
+
+    def _get_tenant(self, name: str) -> Tenant:
+        """
+        Get a tenant and create it on its first request
+
+        Args:
+            name: The name of the tenant
+
+        Returns:
+            The tenant
+        """
+
+        if name not in self.tenants:
+            weight = self.weights.get(name, self.default_weight)
+            self._check_weight(name, weight)
+            self.tenants[name] = Tenant(name, weight, self.concurrency.get(name, self.default_concurrency))
+        return self.tenants[name]
+
+    @staticmethod
+    def _check_weight(name: str, weight: float) -> None:
+        """
+        Make sure a weight is positive, the round robin would never give a slot to a tenant with another weight
+
+        Args:
+            name: The name of the tenant (or setting) the weight belongs to
+            weight: The weight
+        """
+
+        if weight <= 0:
+            message = f'The weight of {name} has to be greater than 0, got {weight}'
+            raise SpotifyError(ErrorMessage(message=message).__dict__)
+
+    def _release(self, tenant: Tenant) -> None:
+        """
+        Free the slot of a finished request
+
+        Args:
+            tenant: The tenant of the request
+        """
+
+        tenant.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Give the free slots to the waiting requests with deficit round robin
+        """
+
+        while self.running < self.max_concurrency and any(
+                tenant.waiting and tenant.running < tenant.concurrency for tenant in self._active):
+            tenant = self._active[0]
+
+            if not tenant.waiting:
+                # A tenant without waiting requests leaves the round and does not keep its deficit
+                self._active.popleft()
+                tenant.deficit, tenant.in_round = 0, False
+                continue
+
+            if tenant.running >= tenant.concurrency:
+                # A tenant which cannot use its deficit does not save it up for a burst later
+                tenant.deficit, tenant.in_round = 0, False
+                self._active.rotate(-1)
+                continue
+
+            if not tenant.in_round:
+                tenant.deficit += tenant.weight
+                tenant.in_round = True
+
+            if tenant.deficit < 1:
+                tenant.in_round = False
+                self._active.rotate(-1)
+                continue
+
+            future = tenant.waiting.popleft()
+            if future.done():
+                continue
+
+            tenant.deficit -= 1
+            tenant.running += 1
+            tenant.sent += 1
+            self.running += 1
+            future.set_result(None)
@@ -0,0 +1,155 @@
+"""
+Hedging of slow idempotent requests to cut the tail latency
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (hedging_policy.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import math
+from collections import deque
+from typing import Dict, Deque, Tuple
+
+from .endpoint_groups import get_endpoint_group
+
+
+class HedgingPolicy:
+    """
+    Decides when a duplicate of a slow request is sent.
+
+    If no response arrived within the hedge delay, a duplicate of the request is sent with the next client session
+    (or another connection of the same session), the first response wins and the other request is cancelled. The delay
+    is a percentile of the recent latencies of the endpoint group of the request (cached and only computed again after
+    a twentieth of the latencies were replaced). Every request adds `budget_ratio` to a hedging budget and every hedge
+    takes one from it, so hedging is capped to this share of the traffic.
+    """
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = 0.05, max_delay: float = 2,
+                 methods: Tuple[str, ...] = ('GET',), budget_ratio: float = 0.05, max_budget: float = 5,
+                 sample_size: int = 1000, min_samples: int = 20):
+        """
+        Create a new hedging policy
+
+        Args:
+            percentile: The percentile of the recent latencies after which the duplicate is sent
+            min_delay: The minimal hedge delay in seconds
+            max_delay: The maximal hedge delay in seconds (also the delay before enough latencies were recorded)
+            methods: The http methods which are hedged (only idempotent methods should be hedged)
+            budget_ratio: The share of the requests which may be hedged
+            max_budget: The maximal number of hedges which can be saved up (also the initial budget)
+            sample_size: The number of recent latencies of every endpoint group the percentile is computed from
+            min_samples: The minimal number of latencies before the percentile is used
+        """
+
+        self.percentile: float = percentile
+        self.min_delay: float = min_delay
+        self.max_delay: float = max_delay
+        self.methods: Tuple[str, ...] = tuple(method.upper() for method in methods)
+        self.budget_ratio: float = budget_ratio
+        self.max_budget: float = max_budget
+        self.sample_size: int = sample_size
+        self.min_samples: int = min_samples
+
+        self.budget: float = max_budget
+        """ The number of hedges which are currently available """
+
+        self.requests: int = 0
+        """ The number of hedgeable requests """
+
+        self.hedges: int = 0
+        """ The number of duplicates which were sent """
+
+        self.hedges_won: int = 0
+        """ The number of duplicates which responded first """
+
+        self.budget_exhausted: int = 0
+        """ The number of slow requests which were not hedged because the budget was exhausted """
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        # endpoint group -> (cached percentile, latencies recorded since it was computed)
+        self._percentiles: Dict[str, Tuple[float, int]] = {}
+
+    def is_hedgeable(self, method: str) -> bool:
+        """
+        Args:
+            method: The http method of the request
+
+        Returns:
+            If requests with this method are hedged
+        """
+
+        return method.upper() in self.methods
+
+    def delay(self, url: str) -> float:
+        """
+        Count a new hedgeable request and get its hedge delay
+
+        Args:
+            url: The url of the request
+
+        Returns:
+            The seconds after which a duplicate should be sent
+        """
+
+        self.requests += 1
+        self.budget = min(self.budget + self.budget_ratio, self.max_budget)
+
+        group = get_endpoint_group(url)
+        latencies = self._latencies.get(group)
+        if not latencies or len(latencies) < self.min_samples:
+            return self.max_delay
+
+        percentile, recorded = self._percentiles.get(group, (0, len(latencies)))
+        if recorded * 20 >= len(latencies):
+            ordered = sorted(latencies)
+            percentile = ordered[min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)]
+            self._percentiles[group] = (percentile, 0)
+
+        return min(self.max_delay, max(self.min_delay, percentile))
+
+    def try_hedge(self) -> bool:
+        """
+        Take a hedge from the budget
+
+        Returns:
+            If a duplicate may be sent
+        """
+
+        if self.budget < 1:
+            self.budget_exhausted += 1
+            return False
+
+        self.budget -= 1
+        self.hedges += 1
+        return True
+
+    def record_latency(self, url: str, latency: float, hedge_won: bool = False) -> None:
+        """
+        Record the latency of a request
+
+        Args:
+            url: The url of the request
+            latency: The seconds since the first request was sent (if the duplicate won, this is the time the first
+                request took at least)
+            hedge_won: If the duplicate responded first
+        """
+
+        group = get_endpoint_group(url)
+        self._latencies.setdefault(group, deque(maxlen=self.sample_size)).append(latency)
+        if group in self._percentiles:
+            percentile, recorded = self._percentiles[group]
+            self._percentiles[group] = (percentile, recorded + 1)
+        if hedge_won:
+            self.hedges_won += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            The number of hedgeable requests, sent duplicates, duplicates which won and exhausted budgets
+        """
+
+        return {'requests': self.requests, 'hedges': self.hedges, 'hedges_won': self.hedges_won,
+                'budget_exhausted': self.budget_exhausted}
@@ -0,0 +1,223 @@
+"""
+Scheduler which limits the concurrent requests of priority classes
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (request_scheduler.py) is part of AsyncSpotify which is released under MIT.           #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Deque, Optional, Iterator, AsyncIterator
+
+from .endpoint_groups import get_endpoint_group
+from .._error_message import ErrorMessage
+from ..spotify_errors import SpotifyError
+
+_active_priority: ContextVar = ContextVar('active_priority', default=None)
+
+
+class PriorityClass:
+    """
+    A named class of requests with its own concurrency limit
+    """
+
+    def __init__(self, name: str, priority: int, concurrency: int):
+        """
+        Create a new priority class
+
+        Args:
+            name: The name of the class
+            priority: The priority of the class (a lower number is served first)
+            concurrency: The maximal number of concurrent requests of the class
+        """
+
+        self.name: str = name
+        self.priority: int = priority
+        self.concurrency: int = concurrency
+
+        self.running: int = 0
+        """ The number of running requests """
+
+        self.sent: int = 0
+        """ The number of requests which were allowed to run """
+
+        self.waited: float = 0
+        """ The total seconds requests of the class waited in the queue """
+
+        self.waiting: Deque[asyncio.Future] = deque()
+        self.skipped: int = 0
+
+    @property
+    def queued(self) -> int:
+        """
+        Returns:
+            The number of requests waiting in the queue
+        """
+
+        return len(self.waiting)
+
+
+class RequestScheduler:
+    """
+    Schedules the requests of a [`SpotifyApiClient`][async_spotify.api.spotify_api_client] by priority.
+
+    Every request is mapped to a priority class by its endpoint group (e.g. player calls are interactive and catalog
+    calls are bulk). Every class has its own concurrency limit and all classes share the maximal concurrency of the
+    scheduler. If a slot gets free the waiting request of the class with the highest priority gets it, but a class
+    which was passed over `starvation_limit` times is served next, so lower classes still make progress.
+    """
+
+    def __init__(self, priority_classes: List[PriorityClass] = None, group_classes: Dict[str, str] = None,
+                 max_concurrency: int = 50, starvation_limit: int = 10):
+        """
+        Create a new request scheduler
+
+        Args:
+            priority_classes: The priority classes. Defaults to interactive (priority 0, 20 concurrent requests) and
+                bulk (priority 1, 40 concurrent requests)
+            group_classes: The name of the priority class of every
+                [endpoint group][async_spotify.policies.endpoint_groups]. Defaults to interactive for player and user
+                calls and bulk for everything else
+            max_concurrency: The maximal number of concurrent requests of all classes
+            starvation_limit: How often a class with waiting requests can be passed over before it is served
+        """
+
+        priority_classes = priority_classes or [PriorityClass('interactive', 0, 20), PriorityClass('bulk', 1, 40)]
+
+        self.priority_classes: Dict[str, PriorityClass] = {
+            priority_class.name: priority_class
+            for priority_class in sorted(priority_classes, key=lambda priority_class: priority_class.priority)}
+
+        self.group_classes: Dict[str, str] = group_classes or {
+            'player': 'interactive', 'user': 'interactive', 'library': 'bulk', 'playlists': 'bulk', 'catalog': 'bulk'}
+
+        self.max_concurrency: int = max_concurrency
+        self.starvation_limit: int = starvation_limit
+        self.running: int = 0
+
+    def classify(self, url: str) -> PriorityClass:
+        """
+        Get the priority class of a request
+
+        Args:
+            url: The url of the request
+
+        Returns:
+            The priority class which was set with `priority` or the class of the endpoint group of the url. Urls of
+            groups without class get the class with the lowest priority
+        """
+
+        name: Optional[str] = _active_priority.get() or self.group_classes.get(get_endpoint_group(url))
+        if name in self.priority_classes:
+            return self.priority_classes[name]
+
+        return list(self.priority_classes.values())[-1]
+
+    @contextmanager
+    def priority(self, name: str) -> Iterator[None]:
+        """
+        Send every request which is made inside the with block (in the current task) with a priority class
+
+        Args:
+            name: The name of the priority class
+        """
+
+        if name not in self.priority_classes:
+            raise SpotifyError(ErrorMessage(message=f'{name} is not one of {list(self.priority_classes)}').__dict__)
+
+        token = _active_priority.set(name)
+        try:
+            yield
+        finally:
+            _active_priority.reset(token)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[PriorityClass]:
+        """
+        Wait for a free slot and hold it while the with block runs
+
+        Args:
+            url: The url of the request
+
+        Returns:
+            The priority class of the request
+        """
+
+        priority_class = self.classify(url)
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        queued_at = loop.time()
+
+        priority_class.waiting.append(future)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(priority_class)
+            elif future in priority_class.waiting:
+                priority_class.waiting.remove(future)
+            raise
+
+        priority_class.waited += loop.time() - queued_at
+
+        try:
+            yield priority_class
+        finally:
+            self._release(priority_class)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            The running, queued and sent requests and the total wait time of every priority class
+        """
+
+        return {name: {'running': priority_class.running, 'queued': priority_class.queued,
+                       'sent': priority_class.sent, 'waited': priority_class.waited}
+                for name, priority_class in self.priority_classes.items()}
+
+    def _release(self, priority_class: PriorityClass) -> None:
+        """
+        Free the slot of a finished request
+
+        Args:
+            priority_class: The priority class of the request
+        """
+
+        priority_class.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Give the free slots to the waiting requests
+        """
+
+        while self.running < self.max_concurrency:
+            candidates = [priority_class for priority_class in self.priority_classes.values()
+                          if priority_class.waiting and priority_class.running < priority_class.concurrency]
+            if not candidates:
+                return
+
+            starved = [priority_class for priority_class in candidates[1:]
+                       if priority_class.skipped >= self.starvation_limit]
+            chosen = starved[0] if starved else candidates[0]
+
+            for priority_class in candidates:
+                priority_class.skipped = 0 if priority_class is chosen else priority_class.skipped + 1
+
+            future = chosen.waiting.popleft()
+            if future.done():
+                continue
+
+            chosen.running += 1
+            chosen.sent += 1
+            self.running += 1
+            future.set_result(None)
@@ -0,0 +1,129 @@
+"""
+Retry policy for transient failures with full jitter exponential backoff
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (retry_policy.py) is part of AsyncSpotify which is released under MIT.                #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import random
+from typing import Tuple, Dict
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and how long to wait before the retry.
+
+    Responses with a transient status code (500, 502, 503, 504), connection errors and timeouts are retried with full
+    jitter exponential backoff (a random delay between zero and `base_delay * 2 ** attempt`). Only idempotent methods
+    are retried by default. Every request adds `budget_ratio` to a retry budget and every retry takes one from it,
+    so apart from the saved up budget retries can never be more than this share of the traffic and a sustained outage
+    does not cause a retry storm.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.1, max_delay: float = 10,
+                 status_codes: Tuple[int, ...] = (500, 502, 503, 504),
+                 methods: Tuple[str, ...] = ('GET', 'PUT', 'DELETE'),
+                 budget_ratio: float = 0.1, max_budget: float = 10):
+        """
+        Create a new retry policy
+
+        Args:
+            max_retries: The maximal number of retries of one request
+            base_delay: The maximal delay of the first retry in seconds
+            max_delay: The maximal delay of every retry in seconds
+            status_codes: The status codes which are retried
+            methods: The http methods which are retried
+            budget_ratio: The share of the requests which may be retries
+            max_budget: The maximal number of retries which can be saved up (also the initial budget)
+        """
+
+        self.max_retries: int = max_retries
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.status_codes: Tuple[int, ...] = status_codes
+        self.methods: Tuple[str, ...] = tuple(method.upper() for method in methods)
+        self.budget_ratio: float = budget_ratio
+        self.max_budget: float = max_budget
+
+        self.budget: float = max_budget
+        """ The number of retries which are currently available """
+
+        self.requests: int = 0
+        """ The number of requests (without retries) """
+
+        self.retries: int = 0
+        """ The number of retries """
+
+        self.budget_exhausted: int = 0
+        """ The number of retries which were not made because the budget was exhausted """
+
+        self.reasons: Dict[str, int] = {}
+        """ The number of retries by reason (status code or exception name) """
+
+    def record_request(self) -> None:
+        """
+        Count a new request and add its share to the retry budget
+        """
+
+        self.requests += 1
+        self.budget = min(self.budget + self.budget_ratio, self.max_budget)
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """
+        Args:
+            status_code: The status code of a response
+
+        Returns:
+            If the status code is transient
+        """
+
+        return status_code in self.status_codes
+
+    def should_retry(self, method: str, attempt: int, reason: str) -> bool:
+        """
+        Decide if a failed request is retried and take the retry from the budget
+
+        Args:
+            method: The http method of the request
+            attempt: The number of retries which were already made
+            reason: The status code or the name of the exception of the failure
+
+        Returns:
+            If the request should be retried
+        """
+
+        if method.upper() not in self.methods or attempt >= self.max_retries:
+            return False
+
+        if self.budget < 1:
+            self.budget_exhausted += 1
+            return False
+
+        self.budget -= 1
+        self.retries += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Args:
+            attempt: The number of retries which were already made
+
+        Returns:
+            The seconds to wait before the next retry
+        """
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Returns:
+            The number of requests, retries, retries which exceeded the budget and the retries by reason
+        """
+
+        return {'requests': self.requests, 'retries': self.retries, 'budget_exhausted': self.budget_exhausted,
+                'reasons': dict(self.reasons)}
@@ -0,0 +1,117 @@
+"""
+Per-call deadlines and per-phase timeouts of the requests to the spotify api
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (timeout_policy.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Iterator
+
+from aiohttp import ClientTimeout
+
+from .endpoint_groups import get_endpoint_group
+
+_active_deadline: ContextVar = ContextVar('active_deadline', default=None)
+
+DEFAULT_GROUP_TIMEOUTS: Dict[str, ClientTimeout] = {
+    'player': ClientTimeout(total=5, connect=2, sock_read=3),
+    'user': ClientTimeout(total=10, connect=3, sock_read=8),
+    'library': ClientTimeout(total=10, connect=3, sock_read=8),
+    'playlists': ClientTimeout(total=15, connect=3, sock_read=10),
+    'catalog': ClientTimeout(total=30, connect=5, sock_read=20),
+}
+"""
+The default timeouts of the endpoint groups. The player is latency sensitive, the catalog contains slow calls like the
+audio analysis
+"""
+
+
+class TimeoutPolicy:
+    """
+    Sets the connect, socket read and total timeout of every request according to its endpoint group.
+
+    The total timeout is capped to the time which is left until the deadline of the call (if one is active), so a single
+    request never outlives the budget of its caller.
+    """
+
+    def __init__(self, group_timeouts: Dict[str, ClientTimeout] = None,
+                 default_timeout: ClientTimeout = ClientTimeout(total=30, connect=5, sock_read=20)):
+        """
+        Create a new timeout policy
+
+        Args:
+            group_timeouts: The timeouts of endpoint groups which replace the
+                [default timeouts](#async_spotify.policies.timeout_policy.DEFAULT_GROUP_TIMEOUTS)
+            default_timeout: The timeout of endpoint groups without a timeout
+        """
+
+        self.group_timeouts: Dict[str, ClientTimeout] = {**DEFAULT_GROUP_TIMEOUTS, **(group_timeouts or {})}
+        self.default_timeout: ClientTimeout = default_timeout
+
+    def timeout(self, url: str) -> ClientTimeout:
+        """
+        Get the timeout of a request
+
+        Args:
+            url: The url of the request
+
+        Returns:
+            The timeout of the endpoint group with the total timeout capped to the remaining time of the deadline
+        """
+
+        timeout = self.group_timeouts.get(get_endpoint_group(url), self.default_timeout)
+
+        remaining = get_remaining_time()
+        if remaining is not None and (timeout.total is None or remaining < timeout.total):
+            timeout = ClientTimeout(total=max(remaining, 0), connect=timeout.connect, sock_read=timeout.sock_read,
+                                    sock_connect=timeout.sock_connect)
+
+        return timeout
+
+
+@contextmanager
+def deadline(timeout: float) -> Iterator[float]:
+    """
+    Give every request which is made inside the with block (in the current task and the tasks it creates) a shared
+    deadline. Retries, backoff and waits on rate limits stop at the deadline and a request which is still running is
+    cancelled with a [`DeadlineExceeded`][async_spotify.spotify_errors.DeadlineExceeded] error.
+
+    Nested deadlines can only shorten the deadline of the outer block.
+
+    Args:
+        timeout: The seconds until the deadline
+
+    Returns:
+        The deadline (in `time.monotonic` seconds)
+    """
+
+    active_deadline: Optional[float] = _active_deadline.get()
+    new_deadline = time.monotonic() + timeout
+    if active_deadline is not None:
+        new_deadline = min(new_deadline, active_deadline)
+
+    token = _active_deadline.set(new_deadline)
+    try:
+        yield new_deadline
+    finally:
+        _active_deadline.reset(token)
+
+
+def get_remaining_time() -> Optional[float]:
+    """
+    Returns:
+        The seconds until the deadline which is active in the current context (negative if it has passed) or None
+    """
+
+    active_deadline: Optional[float] = _active_deadline.get()
+    if active_deadline is None:
+        return None
+
+    return active_deadline - time.monotonic()
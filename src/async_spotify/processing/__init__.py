@@ -0,0 +1,15 @@
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (__init__.py) is part of AsyncSpotify which is released under MIT.                    #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+"""
+Processors which transform the parsed api responses before they are returned
+"""
+
+from .response_processor import ResponseProcessor
+from .market_mask import MarketMask, MarketCompactor
+from .projection import Projection, bypass_projections
+from .entity_store import EntityStore
@@ -0,0 +1,157 @@
+"""
+Normalized store which deduplicates the entities embedded in api responses
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (entity_store.py) is part of AsyncSpotify which is released under MIT.                #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Set
+
+from .response_processor import ResponseProcessor
+
+ENTITY_TYPES: Set[str] = {'album', 'artist', 'episode', 'playlist', 'show', 'track', 'user'}
+""" The object types which get deduplicated """
+
+
+class EntityStore(ResponseProcessor):
+    """
+    Response processor which keeps every spotify object (artists, albums, tracks, ...) keyed by its type and id.
+    If an object of a response is equal to an already stored object the stored instance is used instead, so the
+    same artist embedded in thousands of tracks only exists once in memory. The id and uri strings get interned.
+
+    Every version of an object (the full one, simplified ones embedded in other objects, ...) is kept once per set
+    of fields, so simplified copies get deduplicated even after the full object was stored. The store can also be
+    used as local cache with `get`, which returns the richest version (the one with the most fields).
+
+    Important:
+        Objects are shared between responses, so they should not be modified.
+    """
+
+    def __init__(self, max_entities: int = None):
+        """
+        Create a new entity store
+
+        Args:
+            max_entities: The maximal number of objects which are kept (least recently used objects are removed
+                first together with all their versions). None for no limit
+        """
+
+        self.max_entities: Optional[int] = max_entities
+        self.shared: int = 0
+        """ How often an object was replaced with an already stored instance """
+
+        # (type, id) -> versions of the object by their field names
+        self._entities: 'OrderedDict[Tuple[str, str], Dict[FrozenSet[str], dict]]' = OrderedDict()
+
+    def __call__(self, response: Any) -> Any:
+        """
+        Deduplicate the objects of a response
+
+        Args:
+            response: The parsed json response of the spotify api
+
+        Returns:
+            The response with shared objects
+        """
+
+        return self._deduplicate(response)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entities
+
+    def get(self, entity_type: str, entity_id: str) -> Optional[dict]:
+        """
+        Get a stored object
+
+        Args:
+            entity_type: The type of the object (artist, album, track, ...)
+            entity_id: The spotify id of the object
+
+        Returns:
+            The object or None if it is not part of the store
+        """
+
+        versions: Optional[Dict[FrozenSet[str], dict]] = self._entities.get((entity_type, entity_id))
+        if not versions:
+            return None
+
+        return max(versions.values(), key=len)
+
+    def clear(self) -> None:
+        """
+        Remove all objects from the store
+        """
+
+        self._entities.clear()
+
+    def _deduplicate(self, value: Any) -> Any:
+        """
+        Deduplicate a value recursively (the nested objects first)
+
+        Args:
+            value: A part of the response
+
+        Returns:
+            The deduplicated value
+        """
+
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, (dict, list)):
+                    value[index] = self._deduplicate(item)
+
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, (dict, list)):
+                    value[key] = self._deduplicate(item)
+
+            if value.get('type') in ENTITY_TYPES and isinstance(value.get('id'), str):
+                return self._store(value)
+
+        return value
+
+    def _store(self, entity: dict) -> dict:
+        """
+        Store an object or get the equal stored instance
+
+        Args:
+            entity: The spotify object
+
+        Returns:
+            The instance which should be used in the response
+        """
+
+        entity['id'] = sys.intern(entity['id'])
+        if isinstance(entity.get('uri'), str):
+            entity['uri'] = sys.intern(entity['uri'])
+
+        key = (entity['type'], entity['id'])
+        versions: Optional[Dict[FrozenSet[str], dict]] = self._entities.get(key)
+
+        if versions is None:
+            versions = self._entities[key] = {}
+
+            if self.max_entities is not None and len(self._entities) > self.max_entities:
+                self._entities.popitem(last=False)
+        else:
+            self._entities.move_to_end(key)
+
+        fields = frozenset(entity)
+        stored: Optional[dict] = versions.get(fields)
+
+        if stored is not None and stored == entity:
+            self.shared += 1
+            return stored
+
+        # A changed object replaces the stored version with the same fields
+        versions[fields] = entity
+        return entity
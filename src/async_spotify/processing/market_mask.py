@@ -0,0 +1,106 @@
+"""
+Compact bitmask representation of the available_markets lists
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (market_mask.py) is part of AsyncSpotify which is released under MIT.                 #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import string
+from typing import List, Iterator, Iterable, Any, Dict
+
+from .response_processor import ResponseProcessor
+
+MARKETS: List[str] = [first + second for first in string.ascii_uppercase for second in string.ascii_uppercase]
+""" The fixed market table. Every two letter country code has its own bit, so the table never has to change """
+
+_MARKET_BITS: Dict[str, int] = {market: 1 << index for index, market in enumerate(MARKETS)}
+
+
+class MarketMask(int):
+    """
+    The available markets of an item stored as bitmask over the `MARKETS` table.
+    The mask is an int, so it can be serialized as json and compared cheaply.
+    """
+
+    @classmethod
+    def from_list(cls, market_list: Iterable[str]) -> 'MarketMask':
+        """
+        Create a new mask from a list of markets
+
+        Args:
+            market_list: A list of ISO 3166-1 alpha-2 country codes
+
+        Returns:
+            The mask of the markets
+        """
+
+        bits = 0
+        for market in market_list:
+            bits |= _MARKET_BITS[market]
+
+        return cls(bits)
+
+    def __contains__(self, market: str) -> bool:
+        bit = _MARKET_BITS.get(market)
+        return bit is not None and bool(self & bit)
+
+    def __iter__(self) -> Iterator[str]:
+        bits = int(self)
+        while bits:
+            lowest = bits & -bits
+            yield MARKETS[lowest.bit_length() - 1]
+            bits ^= lowest
+
+    def __len__(self) -> int:
+        return bin(self).count('1')
+
+    def __repr__(self) -> str:
+        return f'MarketMask({len(self)} markets)'
+
+    def to_list(self) -> List[str]:
+        """
+        Returns:
+            The markets as list in the format of the spotify api
+        """
+
+        return list(self)
+
+
+class MarketCompactor(ResponseProcessor):
+    """
+    Response processor which replaces every available_markets list in a response with a
+    [`MarketMask`][async_spotify.processing.market_mask.MarketMask]
+    """
+
+    def __call__(self, response: Any) -> Any:
+        """
+        Replace the available_markets lists of a response
+
+        Args:
+            response: The parsed json response of the spotify api
+
+        Returns:
+            The response with the compacted markets
+        """
+
+        if isinstance(response, dict):
+            for key, value in response.items():
+                if key == 'available_markets' and isinstance(value, list):
+                    try:
+                        response[key] = MarketMask.from_list(value)
+                    except KeyError:
+                        # Keep the list if spotify returns a market which is not a two letter code
+                        pass
+                elif isinstance(value, (dict, list)):
+                    self(value)
+
+        elif isinstance(response, list):
+            for value in response:
+                if isinstance(value, (dict, list)):
+                    self(value)
+
+        return response
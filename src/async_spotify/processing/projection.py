@@ -0,0 +1,192 @@
+"""
+Prune api responses down to the fields which are actually used
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (projection.py) is part of AsyncSpotify which is released under MIT.                  #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Any, Dict, Optional, Iterator
+
+from .response_processor import ResponseProcessor
+
+PAGING_FIELDS: List[str] = ['href', 'next', 'previous', 'total', 'limit', 'offset']
+""" Fields which are kept in every paging object, so pagination keeps working """
+
+_active_projection: ContextVar = ContextVar('active_projection', default=None)
+_projections_bypassed: ContextVar = ContextVar('projections_bypassed', default=False)
+
+
+class Projection(ResponseProcessor):
+    """
+    Response processor which only keeps an allowlist of fields.
+    The fields are dot separated paths (`items.track.artists.id`), lists are traversed transparently.
+
+    A projection can be passed to the [`SpotifyApiClient`][async_spotify.api.spotify_api_client] to prune every
+    response or activated for single calls with `with projection.active(): ...`
+    """
+
+    def __init__(self, paths: List[str]):
+        """
+        Create a new projection
+
+        Args:
+            paths: The dot separated paths of the fields which should be kept
+        """
+
+        self.paths: List[str] = list(paths)
+        self._tree: Dict[str, dict] = {}
+
+        for path in self.paths:
+            node = self._tree
+            for key in path.split('.'):
+                node = node.setdefault(key, {})
+
+    def __call__(self, response: Any) -> Any:
+        """
+        Prune a parsed api response
+
+        Args:
+            response: The parsed json response of the spotify api
+
+        Returns:
+            The pruned response
+        """
+
+        return self._prune(response, self._tree)
+
+    def _prune(self, value: Any, tree: Dict[str, dict]) -> Any:
+        """
+        Prune a value recursively
+
+        Args:
+            value: The value which should be pruned
+            tree: The allowed fields of the value
+
+        Returns:
+            The pruned value
+        """
+
+        if isinstance(value, list):
+            return [self._prune(item, tree) for item in value]
+
+        if not isinstance(value, dict):
+            return value
+
+        pruned = {key: self._prune(value[key], subtree) if subtree else value[key]
+                  for key, subtree in tree.items() if key in value}
+
+        if 'items' in value:
+            for key in PAGING_FIELDS + ['cursors']:
+                if key in value:
+                    pruned.setdefault(key, value[key])
+
+        return pruned
+
+    def fields(self, paging_paths: List[str] = ()) -> str:
+        """
+        Convert the projection into the `fields` query parameter some endpoints of the spotify api support
+
+        Args:
+            paging_paths: The paths of the paging objects in the response ('' for the response itself). The paging
+                fields of these objects are requested as well
+
+        Returns:
+            The fields query parameter
+        """
+
+        tree = self._copy_tree(self._tree)
+
+        for path in paging_paths:
+            keys = [key for key in path.split('.') if key]
+            node = tree
+            for key in keys:
+                node = node.get(key) if node is not None else None
+
+            # Only request the paging fields of objects which are part of the projection
+            if node is not None and (node or not keys):
+                for key in PAGING_FIELDS:
+                    node.setdefault(key, {})
+
+        return self._format_fields(tree)
+
+    @contextmanager
+    def active(self) -> Iterator['Projection']:
+        """
+        Apply the projection to every request which is made inside the with block (in the current task)
+
+        Returns:
+            The projection
+        """
+
+        token = _active_projection.set(self)
+        try:
+            yield self
+        finally:
+            _active_projection.reset(token)
+
+    @classmethod
+    def _copy_tree(cls, tree: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        Deep copy a field tree
+
+        Args:
+            tree: The field tree
+
+        Returns:
+            The copy
+        """
+
+        return {key: cls._copy_tree(subtree) for key, subtree in tree.items()}
+
+    @classmethod
+    def _format_fields(cls, tree: Dict[str, dict]) -> str:
+        """
+        Format a field tree in the spotify fields syntax: `name,items(track(name,id))`
+
+        Args:
+            tree: The field tree
+
+        Returns:
+            The formatted fields
+        """
+
+        return ','.join(f'{key}({cls._format_fields(subtree)})' if subtree else key for key, subtree in tree.items())
+
+
+def get_active_projection() -> Optional[Projection]:
+    """
+    Returns:
+        The projection which is active in the current context or None
+    """
+
+    return _active_projection.get()
+
+
+@contextmanager
+def bypass_projections() -> Iterator[None]:
+    """
+    Return the full responses for every request which is made inside the with block (in the current task and the
+    tasks it creates), even if a projection is active or was passed to the client. Used by helpers which read fields of
+    the responses internally (paging, snapshot ids, ...)
+    """
+
+    token = _projections_bypassed.set(True)
+    try:
+        yield
+    finally:
+        _projections_bypassed.reset(token)
+
+
+def are_projections_bypassed() -> bool:
+    """
+    Returns:
+        If projections are bypassed in the current context
+    """
+
+    return _projections_bypassed.get()
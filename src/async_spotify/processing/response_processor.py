@@ -0,0 +1,33 @@
+"""
+Hook which can be used to transform every api response after it was parsed
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (response_processor.py) is part of AsyncSpotify which is released under MIT.          #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import Any
+
+
+class ResponseProcessor:
+    """
+    Class which describes the interface of a response processor. Pass instances to the
+    [`SpotifyApiClient`][async_spotify.api.spotify_api_client] to transform every successful api response in the order
+    of the list.
+    """
+
+    def __call__(self, response: Any) -> Any:
+        """
+        Transform a parsed api response
+
+        Args:
+            response: The parsed json response of the spotify api
+
+        Returns:
+            The transformed response
+        """
+
+        return response
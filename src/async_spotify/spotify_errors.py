@@ -11,7 +11,7 @@ to get api response if a SpotifyAPIError is raised or should be used to get the
 #  linking to the original source.                                                                 #
 # ##################################################################################################
 
-from typing import Dict
+from typing import Dict, Optional
 
 
 class SpotifyBaseError(Exception):
@@ -60,3 +60,51 @@ class SpotifyAPIError(SpotifyBaseError):
     Custom api error message
     This exception gets throws if the spotify api returns an *non success* return code
     """
+
+    def __init__(self, message: dict, status: Optional[int] = None):
+        self.message: dict = message
+        self.status: Optional[int] = status
+        """ The http status code of the response (also set if the body contains no json) """
+
+
+class PartialWriteError(SpotifyAPIError):
+    """
+    This exception gets thrown if a write which had to be split into several requests failed after some of the
+    requests were successful. The original error is the `__cause__` of this error
+    """
+
+    def __init__(self, message: dict, completed: int, snapshot_id: Optional[str] = None,
+                 retry_after: Optional[float] = None, status: Optional[int] = None):
+        self.message: dict = message
+        self.status: Optional[int] = status
+        """ The http status code of the failed request (None if it did not fail with an api error) """
+
+        self.completed: int = completed
+        """ The number of items which were written before the error occurred """
+
+        self.snapshot_id: Optional[str] = snapshot_id
+        """ The snapshot id after the last successful request (if the endpoint returns one) """
+
+        self.retry_after: Optional[float] = retry_after
+        """ The seconds to wait before the rest is written, if the rate limit was exceeded or a circuit is open """
+
+
+class CircuitOpenError(SpotifyBaseError):
+    """
+    This exception gets thrown without sending the request if the circuit breaker of the endpoint group is open,
+    because too many of the recent requests failed
+    """
+
+    def __init__(self, message: dict, group: str, retry_after: float):
+        self.message: dict = message
+        self.group: str = group
+        """ The endpoint group of the open circuit (all if the breaker is not per endpoint group) """
+
+        self.retry_after: float = retry_after
+        """ The seconds until the circuit lets probe requests through again """
+
+
+class DeadlineExceeded(SpotifyBaseError):
+    """
+    This exception gets thrown if the deadline of the call passed before the request could be answered
+    """
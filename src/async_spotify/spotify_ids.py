@@ -0,0 +1,495 @@
+"""
+Compact 128 bit representation of spotify ids and array backed id sets and maps.
+A SpotifyId can be passed to every endpoint method which accepts a spotify id string.
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (spotify_ids.py) is part of AsyncSpotify which is released under MIT.                 #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+from typing import Iterable, Iterator, Optional, Tuple, Union, Dict, Set, Any
+from urllib.parse import urlparse
+
+from ._error_message import ErrorMessage
+from ._numpy import require_numpy
+from .spotify_errors import SpotifyError
+
+BASE62_ALPHABET: str = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+""" The alphabet spotify uses for the base62 ids """
+
+_BASE62_VALUES: Dict[str, int] = {character: value for value, character in enumerate(BASE62_ALPHABET)}
+_ID_LENGTH: int = 22
+_MAX_ID: int = (1 << 128) - 1
+
+
+class SpotifyId(int):
+    """
+    A spotify id stored as 128 bit int. Converting the id to a string (`str`, `format`, f-strings) returns the
+    base62 id spotify uses, so it can be used wherever the endpoints accept a spotify id string.
+    An id is equal to (and hashes like) its base62 string, but not to plain ints. Use `str` before serializing an id,
+    json writes it as int.
+    """
+
+    def __new__(cls, value: Union[str, int]) -> 'SpotifyId':
+        """
+        Create a new spotify id
+
+        Args:
+            value: A base62 id, a spotify uri, an open.spotify.com url or the id as int
+
+        Returns:
+            The spotify id
+        """
+
+        if isinstance(value, str):
+            _, value = parse_spotify_reference(value)
+        elif not 0 <= value <= _MAX_ID:
+            raise SpotifyError(ErrorMessage(message=f'{value} is not a valid 128 bit spotify id').__dict__)
+
+        return super().__new__(cls, value)
+
+    @classmethod
+    def from_base62(cls, base62_id: str) -> 'SpotifyId':
+        """
+        Decode a base62 spotify id
+
+        Args:
+            base62_id: The 22 character spotify id
+
+        Returns:
+            The spotify id
+        """
+
+        value = 0
+        try:
+            for character in base62_id:
+                value = value * 62 + _BASE62_VALUES[character]
+        except KeyError:
+            value = -1
+
+        if len(base62_id) != _ID_LENGTH or not 0 <= value <= _MAX_ID:
+            raise SpotifyError(ErrorMessage(message=f'{base62_id} is not a valid spotify id').__dict__)
+
+        return super().__new__(cls, value)
+
+    def to_base62(self) -> str:
+        """
+        Returns:
+            The 22 character base62 id
+        """
+
+        value = int(self)
+        characters = []
+        for _ in range(_ID_LENGTH):
+            value, remainder = divmod(value, 62)
+            characters.append(BASE62_ALPHABET[remainder])
+
+        return ''.join(reversed(characters))
+
+    def to_uri(self, item_type: str) -> str:
+        """
+        Get the spotify uri of the id
+
+        Args:
+            item_type: The type of the item (track, album, artist, ...)
+
+        Returns:
+            The spotify uri (spotify:track:...)
+        """
+
+        return f'spotify:{item_type}:{self.to_base62()}'
+
+    def __str__(self) -> str:
+        return self.to_base62()
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.to_base62(), format_spec)
+
+    def __repr__(self) -> str:
+        return f'SpotifyId({self.to_base62()!r})'
+
+    def __eq__(self, other: Any) -> bool:
+        # Ids are equal to their base62 string, so both forms can be mixed as keys of sets and dicts
+        if isinstance(other, SpotifyId):
+            return int(self) == int(other)
+        if isinstance(other, str):
+            return self.to_base62() == other
+        return False
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash(self.to_base62())
+
+    def to_bytes_key(self) -> bytes:
+        """
+        Returns:
+            The id as 16 big endian bytes (used as key of the id sets and maps)
+        """
+
+        return int(self).to_bytes(16, 'big')
+
+
+def parse_spotify_reference(reference: str) -> Tuple[Optional[str], SpotifyId]:
+    """
+    Parse a base62 id, a spotify uri (spotify:track:...) or an url (https://open.spotify.com/track/...)
+
+    Args:
+        reference: The reference to a spotify item
+
+    Returns:
+        A tuple with the type of the item (None for plain ids) and the id
+    """
+
+    item_type: Optional[str] = None
+    base62_id: str = reference
+
+    if reference.startswith('spotify:'):
+        parts = reference.split(':')
+        item_type, base62_id = parts[-2], parts[-1]
+
+    elif reference.startswith(('http://', 'https://')):
+        parts = [part for part in urlparse(reference).path.split('/') if part]
+        if len(parts) >= 2:
+            item_type, base62_id = parts[-2], parts[-1]
+
+    return item_type, SpotifyId.from_base62(base62_id)
+
+
+def _to_key(spotify_id: Union[SpotifyId, str, int]) -> bytes:
+    """
+    Convert an id to the key used by the id sets and maps
+
+    Args:
+        spotify_id: A spotify id, a base62 id, uri or url
+
+    Returns:
+        The 16 byte key
+    """
+
+    if not isinstance(spotify_id, SpotifyId):
+        spotify_id = SpotifyId(spotify_id)
+
+    return spotify_id.to_bytes_key()
+
+
+def _keys_to_array(key_list: Iterable[bytes]) -> 'numpy.ndarray':
+    """
+    Convert keys to a numpy array
+
+    Args:
+        key_list: The 16 byte keys
+
+    Returns:
+        The keys as S16 array
+    """
+
+    np = require_numpy()
+    return np.frombuffer(b''.join(key_list), dtype='S16').copy()
+
+
+def _key_to_id(key: bytes) -> SpotifyId:
+    """
+    Convert a key of an id set or map back to the spotify id
+
+    Args:
+        key: The 16 byte key (numpy strips the trailing zero bytes)
+
+    Returns:
+        The spotify id
+    """
+
+    return SpotifyId(int.from_bytes(key.ljust(16, b'\0'), 'big'))
+
+
+class IdSet:
+    """
+    A set of spotify ids which stores every id as 16 bytes in a sorted numpy array (requires numpy).
+    Added ids are buffered and merged in batches, lookups are binary searches and can be vectorized with
+    `contains_many`.
+    """
+
+    def __init__(self, id_list: Iterable[Union[SpotifyId, str]] = (), buffer_size: int = 4096):
+        """
+        Create a new id set
+
+        Args:
+            id_list: The initial ids (spotify ids, base62 ids, uris or urls)
+            buffer_size: The minimum number of added ids which are buffered before they get merged into the array. The
+                buffer grows with the set (to an eighth of its size), so adding n ids takes O(n log n)
+        """
+
+        np = require_numpy()
+
+        self.buffer_size: int = buffer_size
+        self._keys: np.ndarray = np.empty(0, dtype='S16')
+        self._pending: Set[bytes] = set()
+
+        self.update(id_list)
+
+    def add(self, spotify_id: Union[SpotifyId, str]) -> None:
+        """
+        Add an id to the set
+
+        Args:
+            spotify_id: A spotify id, base62 id, uri or url
+        """
+
+        self._pending.add(_to_key(spotify_id))
+
+        if len(self._pending) >= max(self.buffer_size, len(self._keys) >> 3):
+            self._flush()
+
+    def update(self, id_list: Iterable[Union[SpotifyId, str]]) -> None:
+        """
+        Add several ids to the set
+
+        Args:
+            id_list: The ids
+        """
+
+        for spotify_id in id_list:
+            self.add(spotify_id)
+
+    def contains_many(self, id_list: Iterable[Union[SpotifyId, str]]) -> 'numpy.ndarray':
+        """
+        Check for several ids if they are part of the set
+
+        Args:
+            id_list: The ids
+
+        Returns:
+            A bool array with the result for every id
+        """
+
+        self._flush()
+        return self._search(_keys_to_array(_to_key(spotify_id) for spotify_id in id_list))[1]
+
+    def __contains__(self, spotify_id: Union[SpotifyId, str]) -> bool:
+        key = _to_key(spotify_id)
+        if key in self._pending:
+            return True
+
+        return bool(self._search(_keys_to_array([key]))[1][0])
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[SpotifyId]:
+        self._flush()
+        return (_key_to_id(key) for key in self._keys.tolist())
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            The number of bytes used by the stored ids
+        """
+
+        self._flush()
+        return self._keys.nbytes
+
+    def save(self, file_path: str) -> None:
+        """
+        Save the set to a .npy file
+
+        Args:
+            file_path: The path of the file
+        """
+
+        self._flush()
+        require_numpy().save(file_path, self._keys)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'IdSet':
+        """
+        Load a set which was saved with `save`
+
+        Args:
+            file_path: The path of the file
+
+        Returns:
+            The loaded set
+        """
+
+        id_set = cls()
+        id_set._keys = require_numpy().load(file_path)
+        return id_set
+
+    def _search(self, keys: 'numpy.ndarray') -> Tuple['numpy.ndarray', 'numpy.ndarray']:
+        """
+        Binary search keys in the sorted array
+
+        Args:
+            keys: The keys as S16 array
+
+        Returns:
+            The insertion indices and a bool array which is True for every key that was found
+        """
+
+        np = require_numpy()
+
+        indices = np.searchsorted(self._keys, keys)
+        found = indices < len(self._keys)
+        found[found] = self._keys[indices[found]] == keys[found]
+        return indices, found
+
+    def _flush(self) -> None:
+        """
+        Merge the buffered ids into the sorted array
+        """
+
+        if not self._pending:
+            return
+
+        np = require_numpy()
+
+        # Only the buffered keys get sorted, the insert merges them with a single pass over the stored keys
+        keys = np.sort(_keys_to_array(self._pending))
+        indices, found = self._search(keys)
+        self._keys = np.insert(self._keys, indices[~found], keys[~found])
+        self._pending = set()
+
+
+class IdMap:
+    """
+    A map from spotify ids to numbers (indices, timestamps, ...) which stores the ids as 16 bytes in a sorted numpy
+    array and the values in a parallel numpy array (requires numpy).
+    """
+
+    def __init__(self, dtype: Any = 'int64', buffer_size: int = 4096):
+        """
+        Create a new id map
+
+        Args:
+            dtype: The numpy dtype of the values
+            buffer_size: The minimum number of changed ids which are buffered before they get merged into the arrays.
+                The buffer grows with the map (to an eighth of its size), so setting n ids takes O(n log n)
+        """
+
+        np = require_numpy()
+
+        self.buffer_size: int = buffer_size
+        self._keys: np.ndarray = np.empty(0, dtype='S16')
+        self._values: np.ndarray = np.empty(0, dtype=dtype)
+        self._pending: Dict[bytes, Any] = {}
+
+    def __setitem__(self, spotify_id: Union[SpotifyId, str], value: Any) -> None:
+        self._pending[_to_key(spotify_id)] = value
+
+        if len(self._pending) >= max(self.buffer_size, len(self._keys) >> 3):
+            self._flush()
+
+    def __getitem__(self, spotify_id: Union[SpotifyId, str]) -> Any:
+        key = _to_key(spotify_id)
+        if key in self._pending:
+            return self._pending[key]
+
+        values, found = self._lookup(_keys_to_array([key]))
+        if not found[0]:
+            raise KeyError(spotify_id)
+
+        return values[0].item()
+
+    def __contains__(self, spotify_id: Union[SpotifyId, str]) -> bool:
+        try:
+            self[spotify_id]
+        except KeyError:
+            return False
+
+        return True
+
+    def get(self, spotify_id: Union[SpotifyId, str], default: Any = None) -> Any:
+        """
+        Get the value of an id
+
+        Args:
+            spotify_id: A spotify id, base62 id, uri or url
+            default: The value which is returned if the id is not part of the map
+
+        Returns:
+            The value
+        """
+
+        try:
+            return self[spotify_id]
+        except KeyError:
+            return default
+
+    def get_many(self, id_list: Iterable[Union[SpotifyId, str]]) -> Tuple['numpy.ndarray', 'numpy.ndarray']:
+        """
+        Get the values of several ids
+
+        Args:
+            id_list: The ids
+
+        Returns:
+            The values (undefined for missing ids) and a bool array which is True for every id that was found
+        """
+
+        self._flush()
+        return self._lookup(_keys_to_array(_to_key(spotify_id) for spotify_id in id_list))
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._keys)
+
+    def items(self) -> Iterator[Tuple[SpotifyId, Any]]:
+        """
+        Returns:
+            An iterator over the ids and values
+        """
+
+        self._flush()
+        return ((_key_to_id(key), value) for key, value in zip(self._keys.tolist(), self._values.tolist()))
+
+    def _lookup(self, keys: 'numpy.ndarray') -> Tuple['numpy.ndarray', 'numpy.ndarray']:
+        """
+        Binary search keys in the sorted array
+
+        Args:
+            keys: The keys as S16 array
+
+        Returns:
+            The values and a bool array which is True for every key that was found
+        """
+
+        np = require_numpy()
+
+        indices = np.searchsorted(self._keys, keys)
+        found = indices < len(self._keys)
+        found[found] = self._keys[indices[found]] == keys[found]
+
+        values = np.zeros(len(keys), dtype=self._values.dtype)
+        values[found] = self._values[indices[found]]
+        return values, found
+
+    def _flush(self) -> None:
+        """
+        Merge the buffered changes into the sorted arrays. Buffered values replace stored values.
+        """
+
+        if not self._pending:
+            return
+
+        np = require_numpy()
+
+        keys = _keys_to_array(self._pending.keys())
+        values = np.array(list(self._pending.values()), dtype=self._values.dtype)
+        order = np.argsort(keys)
+        keys, values = keys[order], values[order]
+
+        indices = np.searchsorted(self._keys, keys)
+        found = indices < len(self._keys)
+        found[found] = self._keys[indices[found]] == keys[found]
+
+        # Stored keys get the buffered value, new keys are merged with a single pass over the stored keys
+        self._values[indices[found]] = values[found]
+        self._keys = np.insert(self._keys, indices[~found], keys[~found])
+        self._values = np.insert(self._values, indices[~found], values[~found])
+        self._pending = {}
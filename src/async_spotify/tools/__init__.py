@@ -0,0 +1,17 @@
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (__init__.py) is part of AsyncSpotify which is released under MIT.                    #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+"""
+High level tools built on top of the endpoints of the spotify api client
+"""
+
+from .artist_crawler import ArtistCrawler, CrawlProgress
+from .playlist_cache import PlaylistCache
+from .library_sync import LibrarySync, LibraryState, LibraryDelta
+from .library_mirror import LibraryMirror
+from .write_coalescer import WriteCoalescer
+from .player_dispatcher import PlayerDispatcher
@@ -0,0 +1,267 @@
+"""
+Breadth first crawler over the related artists graph
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (artist_crawler.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import List, Tuple, Deque, Dict, Optional, AsyncIterator, Callable
+
+from ..api._endpoints.endpoint import Endpoint
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ..processing.projection import bypass_projections
+from .._error_message import ErrorMessage
+from ..spotify_errors import RateLimitExceeded, SpotifyAPIError, SpotifyError
+from ..spotify_ids import IdSet, SpotifyId
+
+
+class CrawlProgress:
+    """
+    Progress and throughput of a crawl
+    """
+
+    def __init__(self):
+        self.started: float = time.monotonic()
+        self.expanded: int = 0
+        """ The number of artists whose related artists were fetched """
+
+        self.discovered: int = 0
+        """ The number of artists which were returned by the crawler """
+
+        self.requests: int = 0
+        """ The number of api requests """
+
+        self.errors: int = 0
+        """ The number of artists which could not be expanded """
+
+        self.rate_limited: int = 0
+        """ How often the crawler had to wait because of the rate limit """
+
+        self.frontier: int = 0
+        """ The number of artists which still have to be expanded """
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Returns:
+            The seconds since the crawl started
+        """
+
+        return time.monotonic() - self.started
+
+    @property
+    def requests_per_second(self) -> float:
+        """
+        Returns:
+            The average number of requests per second
+        """
+
+        return self.requests / max(self.elapsed, 1e-9)
+
+
+class ArtistCrawler:
+    """
+    Crawls the related artists graph breadth first with a bounded number of concurrent requests.
+
+    The related artists endpoint already returns full artist objects, so only the seed artists get hydrated (in
+    batches of 50). The visited artists are kept in a compact [`IdSet`][async_spotify.spotify_ids.IdSet] (requires
+    numpy) and the frontier can be checkpointed to disk, so an interrupted crawl can be resumed. Artists which were
+    returned after the last checkpoint can be returned again after a resume.
+    """
+
+    def __init__(self, spotify_api_client, max_depth: int = 2, concurrency: int = 10,
+                 checkpoint_path: str = None, checkpoint_interval: int = 100,
+                 progress_callback: Callable[[CrawlProgress], None] = None,
+                 auth_token: SpotifyAuthorisationToken = None):
+        """
+        Create a new crawler
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            max_depth: The maximal distance of a returned artist to the seed artists
+            concurrency: The maximal number of concurrent requests
+            checkpoint_path: The path (without extension) the frontier and the visited artists are saved to.
+                None disables checkpointing
+            checkpoint_interval: Save a checkpoint after this number of expanded artists (at least 1)
+            progress_callback: A function which is called with the progress after every expanded artist
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        if checkpoint_interval < 1:
+            raise SpotifyError(ErrorMessage(
+                message=f'The checkpoint interval has to be at least 1, got {checkpoint_interval}').__dict__)
+
+        self.spotify_api_client = spotify_api_client
+        self.max_depth: int = max_depth
+        self.concurrency: int = concurrency
+        self.checkpoint_path: Optional[str] = checkpoint_path
+        self.checkpoint_interval: int = checkpoint_interval
+        self.progress_callback: Optional[Callable[[CrawlProgress], None]] = progress_callback
+        self.auth_token: SpotifyAuthorisationToken = auth_token
+
+        self.progress: CrawlProgress = CrawlProgress()
+        self._visited: IdSet = IdSet()
+        self._frontier: Deque[Tuple[str, int]] = deque()
+        self._running: Dict[asyncio.Future, Tuple[str, int]] = {}
+        self._resume_at: float = 0
+
+    async def crawl(self, seed_artist_id_list: List[str]) -> AsyncIterator[Tuple[dict, int]]:
+        """
+        Crawl the related artists graph. If a checkpoint exists the crawl is resumed and the seeds are ignored.
+
+        Args:
+            seed_artist_id_list: The ids of the artists the crawl starts with
+
+        Returns:
+            An async iterator over the artists and their distance to the seed artists
+        """
+
+        self.progress = CrawlProgress()
+
+        if not self._load_checkpoint():
+            self._visited = IdSet(seed_artist_id_list)
+            self._frontier = deque((artist_id, 0) for artist_id in seed_artist_id_list if self.max_depth > 0)
+
+            for chunk in Endpoint._chunks(seed_artist_id_list, 50):
+                response = await self._request(self.spotify_api_client.artists.get_several, chunk)
+                for artist in filter(None, response['artists']):
+                    self.progress.discovered += 1
+                    yield artist, 0
+
+        try:
+            async for result in self._expand_frontier():
+                yield result
+        finally:
+            for task in self._running:
+                task.cancel()
+            await asyncio.gather(*self._running, return_exceptions=True)
+            self._save_checkpoint()
+            self._running.clear()
+
+    async def _expand_frontier(self) -> AsyncIterator[Tuple[dict, int]]:
+        """
+        Expand the frontier until it is empty
+
+        Returns:
+            An async iterator over the newly discovered artists and their depth
+        """
+
+        while self._frontier or self._running:
+            while self._frontier and len(self._running) < self.concurrency:
+                artist_id, depth = self._frontier.popleft()
+                task = asyncio.ensure_future(self._request(self.spotify_api_client.artists.get_similar, artist_id))
+                self._running[task] = (artist_id, depth)
+
+            if not self._running:
+                break
+
+            done, _ = await asyncio.wait(list(self._running), return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                artist_id, depth = self._running[task]
+
+                try:
+                    response = task.result()
+                except SpotifyAPIError:
+                    self.progress.errors += 1
+                    del self._running[task]
+                    continue
+
+                for artist in response['artists']:
+                    if artist['id'] in self._visited:
+                        continue
+
+                    self._visited.add(artist['id'])
+                    if depth + 1 < self.max_depth:
+                        self._frontier.append((artist['id'], depth + 1))
+                    self.progress.discovered += 1
+                    yield artist, depth + 1
+
+                # Only remove the artist after all related artists were returned, so it is part of every checkpoint
+                # until then
+                del self._running[task]
+                self.progress.expanded += 1
+                self.progress.frontier = len(self._frontier) + len(self._running)
+
+                if self.progress_callback:
+                    self.progress_callback(self.progress)
+
+                if self.progress.expanded % self.checkpoint_interval == 0:
+                    self._save_checkpoint()
+
+    async def _request(self, method, *args) -> dict:
+        """
+        Make a request and wait and retry if the rate limit was exceeded
+
+        Args:
+            method: The endpoint method
+            args: The arguments of the method
+
+        Returns:
+            The api response
+        """
+
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self.progress.requests += 1
+            try:
+                with bypass_projections():
+                    return await method(*args, auth_token=self.auth_token)
+            except RateLimitExceeded as error:
+                self.progress.rate_limited += 1
+                self._resume_at = max(self._resume_at, time.monotonic() + max(error.retry_after, 1))
+
+    def _save_checkpoint(self) -> None:
+        """
+        Save the frontier (including the artists which are currently expanded) and the visited artists.
+        The checkpoint is removed if the crawl is complete.
+        """
+
+        if not self.checkpoint_path:
+            return
+
+        if not self._frontier and not self._running:
+            for suffix in ['visited.npy', 'frontier.json']:
+                if os.path.exists(f'{self.checkpoint_path}.{suffix}'):
+                    os.remove(f'{self.checkpoint_path}.{suffix}')
+            return
+
+        # Json would write compact ids as ints, so they are stored as base62 strings
+        frontier = [(str(artist_id), depth) for artist_id, depth in list(self._running.values()) + list(self._frontier)]
+
+        self._visited.save(f'{self.checkpoint_path}.visited.tmp.npy')
+        with open(f'{self.checkpoint_path}.frontier.tmp.json', 'w') as file:
+            json.dump(frontier, file)
+
+        os.replace(f'{self.checkpoint_path}.visited.tmp.npy', f'{self.checkpoint_path}.visited.npy')
+        os.replace(f'{self.checkpoint_path}.frontier.tmp.json', f'{self.checkpoint_path}.frontier.json')
+
+    def _load_checkpoint(self) -> bool:
+        """
+        Load the frontier and the visited artists of a previous crawl
+
+        Returns:
+            Was a checkpoint loaded
+        """
+
+        if not self.checkpoint_path or not os.path.exists(f'{self.checkpoint_path}.frontier.json'):
+            return False
+
+        with open(f'{self.checkpoint_path}.frontier.json') as file:
+            self._frontier = deque((str(SpotifyId(artist_id)), depth) for artist_id, depth in json.load(file))
+
+        self._visited = IdSet.load(f'{self.checkpoint_path}.visited.npy')
+        return True
+
@@ -0,0 +1,255 @@
+"""
+Local mirror of the saved items of a user which answers contains checks without requests
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (library_mirror.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+import time
+from typing import List, Dict, Iterable
+
+from .library_sync import LibrarySync, LIBRARY_KINDS
+from ..api._endpoints.endpoint import Endpoint
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+
+
+class LibraryMirror:
+    """
+    Mirrors the saved tracks, albums and shows of one user.
+
+    The mirror is filled and kept current by an incremental [`LibrarySync`][async_spotify.tools.library_sync] and by
+    the add and remove calls made through the mirror. A contains check of a warm mirror is answered locally. If the
+    last sync is older than the staleness bound an incremental sync (usually one request) is done first. A cold mirror
+    (one which was never refreshed) answers with concurrent contains requests of 50 ids.
+
+    Important:
+        Only the writes made through the mirror are applied to it directly (after a refresh which is in progress, so
+        pages fetched before the write cannot undo it). Writes made through `spotify_api_client.library`, a
+        [`WriteCoalescer`][async_spotify.tools.write_coalescer] or other clients are only seen after the next sync
+        (added items) or the next reconciliation (removed items).
+    """
+
+    def __init__(self, spotify_api_client, user_id: str = 'me', max_staleness: float = 5 * 60,
+                 reconcile_interval: float = 24 * 60 * 60, auth_token: SpotifyAuthorisationToken = None):
+        """
+        Create a new library mirror
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            user_id: The id of the user the auth token belongs to
+            max_staleness: The maximal age of the mirror in seconds before a contains check syncs it again
+            reconcile_interval: The seconds after which a sync also checks for removed items
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        self.spotify_api_client = spotify_api_client
+        self.user_id: str = user_id
+        self.max_staleness: float = max_staleness
+        self.auth_token: SpotifyAuthorisationToken = auth_token
+
+        self._syncs: Dict[str, LibrarySync] = {
+            kind: LibrarySync(spotify_api_client, kind, reconcile_interval, auth_token) for kind in LIBRARY_KINDS}
+        self._synced_at: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Future] = {}
+
+    def is_warm(self, kind: str) -> bool:
+        """
+        Args:
+            kind: The kind of saved items (tracks, albums or shows)
+
+        Returns:
+            If the mirror of this kind was synced at least once
+        """
+
+        return kind in self._synced_at
+
+    async def refresh(self, kind: str = None) -> None:
+        """
+        Sync the mirror with the library. Concurrent refreshes of the same kind share one sync.
+
+        Args:
+            kind: The kind of saved items (tracks, albums or shows). None refreshes every kind
+        """
+
+        kinds: List[str] = [kind] if kind else list(LIBRARY_KINDS)
+
+        for item_kind in kinds:
+            if item_kind not in self._refreshing:
+                self._refreshing[item_kind] = asyncio.ensure_future(self._sync(item_kind))
+                self._refreshing[item_kind].add_done_callback(
+                    lambda _, done_kind=item_kind: self._refreshing.pop(done_kind, None))
+
+        await asyncio.gather(*[asyncio.shield(self._refreshing[item_kind]) for item_kind in kinds])
+
+    async def contains_tracks(self, track_id_list: List[str]) -> List[bool]:
+        """
+        Args:
+            track_id_list: The ids of the tracks (any length)
+
+        Returns:
+            Does the user library contain the track
+        """
+
+        return await self._contains('tracks', track_id_list)
+
+    async def contains_albums(self, album_id_list: List[str]) -> List[bool]:
+        """
+        Args:
+            album_id_list: The ids of the albums (any length)
+
+        Returns:
+            Does the user library contain the album
+        """
+
+        return await self._contains('albums', album_id_list)
+
+    async def contains_shows(self, show_id_list: List[str]) -> List[bool]:
+        """
+        Args:
+            show_id_list: The ids of the shows (any length)
+
+        Returns:
+            Does the user library contain the show
+        """
+
+        return await self._contains('shows', show_id_list)
+
+    async def add_tracks(self, track_id_list: List[str]) -> None:
+        """
+        Save tracks and add them to the mirror
+
+        Args:
+            track_id_list: The ids of the tracks (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.add_tracks, track_id_list)
+        await self._update('tracks', added=track_id_list)
+
+    async def add_albums(self, album_id_list: List[str]) -> None:
+        """
+        Save albums and add them to the mirror
+
+        Args:
+            album_id_list: The ids of the albums (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.add_album, album_id_list)
+        await self._update('albums', added=album_id_list)
+
+    async def add_shows(self, show_id_list: List[str]) -> None:
+        """
+        Save shows and add them to the mirror
+
+        Args:
+            show_id_list: The ids of the shows (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.add_shows, show_id_list)
+        await self._update('shows', added=show_id_list)
+
+    async def remove_tracks(self, track_id_list: List[str]) -> None:
+        """
+        Remove saved tracks and remove them from the mirror
+
+        Args:
+            track_id_list: The ids of the tracks (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.remove_tracks, track_id_list)
+        await self._update('tracks', removed=track_id_list)
+
+    async def remove_albums(self, album_id_list: List[str]) -> None:
+        """
+        Remove saved albums and remove them from the mirror
+
+        Args:
+            album_id_list: The ids of the albums (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.remove_albums, album_id_list)
+        await self._update('albums', removed=album_id_list)
+
+    async def remove_shows(self, show_id_list: List[str]) -> None:
+        """
+        Remove saved shows and remove them from the mirror
+
+        Args:
+            show_id_list: The ids of the shows (any length)
+        """
+
+        await self._write(self.spotify_api_client.library.remove_shows, show_id_list)
+        await self._update('shows', removed=show_id_list)
+
+    async def _sync(self, kind: str) -> None:
+        """
+        Sync one kind of saved items
+
+        Args:
+            kind: The kind of saved items
+        """
+
+        started = time.monotonic()
+        await self._syncs[kind].sync(self.user_id, self.auth_token)
+        self._synced_at[kind] = started
+
+    async def _contains(self, kind: str, id_list: List[str]) -> List[bool]:
+        """
+        Check if the items are saved
+
+        Args:
+            kind: The kind of saved items
+            id_list: The ids of the items
+
+        Returns:
+            Does the user library contain the item
+        """
+
+        if not self.is_warm(kind):
+            contains = getattr(self.spotify_api_client.library, LIBRARY_KINDS[kind][1])
+            responses: List[List[bool]] = await asyncio.gather(
+                *[contains(chunk, self.auth_token) for chunk in Endpoint._chunks(id_list, 50)])
+            return [saved for response in responses for saved in response]
+
+        if time.monotonic() - self._synced_at[kind] > self.max_staleness:
+            await self.refresh(kind)
+
+        saved_ids = self._syncs[kind].states[self.user_id].saved_ids
+        return [item_id in saved_ids for item_id in id_list]
+
+    async def _write(self, method, id_list: List[str]) -> None:
+        """
+        Send an add or remove request for every 50 ids concurrently
+
+        Args:
+            method: The library method
+            id_list: The ids of the items
+        """
+
+        await asyncio.gather(*[method(chunk, self.auth_token) for chunk in Endpoint._chunks(id_list, 50)])
+
+    async def _update(self, kind: str, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        """
+        Apply a write to the mirror. A refresh which is in progress may have fetched its pages before the write, so
+        the write is applied after it finished
+
+        Args:
+            kind: The kind of saved items
+            added: The ids which were saved
+            removed: The ids which were removed
+        """
+
+        if kind in self._refreshing:
+            await asyncio.wait([self._refreshing[kind]])
+
+        state = self._syncs[kind].states.get(self.user_id)
+        if state is None:
+            return
+
+        state.saved_ids.update(added)
+        state.saved_ids.difference_update(removed)
+        state.watermark_ids.difference_update(removed)
@@ -0,0 +1,241 @@
+"""
+Incremental sync of the saved tracks, albums or shows of users
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (library_sync.py) is part of AsyncSpotify which is released under MIT.                #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+import time
+from typing import List, Dict, Set, Optional, Iterable, Tuple
+
+from ..api._endpoints.endpoint import Endpoint
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ..processing.projection import bypass_projections
+from .._error_message import ErrorMessage
+from ..spotify_errors import SpotifyError
+
+LIBRARY_KINDS: Dict[str, Tuple[str, str, str]] = {
+    'tracks': ('get_tracks', 'contains_tracks', 'track'),
+    'albums': ('get_albums', 'contains_albums', 'album'),
+    'shows': ('get_shows', 'contains_shows', 'show'),
+}
+""" The library endpoint methods (get, contains) and the item key of every kind of saved item """
+
+
+class LibraryState:
+    """
+    The synced state of the library of one user
+    """
+
+    def __init__(self, watermark: str = None, watermark_ids: Iterable[str] = (), saved_ids: Iterable[str] = (),
+                 reconciled_at: float = 0):
+        """
+        Create a new library state
+
+        Args:
+            watermark: The added_at timestamp of the newest item which was seen
+            watermark_ids: The ids of the items which were added at the watermark
+            saved_ids: The ids of all saved items
+            reconciled_at: The unix time of the last full reconciliation
+        """
+
+        self.watermark: Optional[str] = watermark
+        self.watermark_ids: Set[str] = set(watermark_ids)
+        self.saved_ids: Set[str] = set(saved_ids)
+        self.reconciled_at: float = reconciled_at
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            A json serializable representation of the state
+        """
+
+        return {
+            'watermark': self.watermark,
+            'watermark_ids': sorted(self.watermark_ids),
+            'saved_ids': sorted(self.saved_ids),
+            'reconciled_at': self.reconciled_at
+        }
+
+    @staticmethod
+    def from_dict(state: dict) -> 'LibraryState':
+        """
+        Args:
+            state: A state which was created with to_dict
+
+        Returns:
+            The library state
+        """
+
+        return LibraryState(**state)
+
+
+class LibraryDelta:
+    """
+    The changes of a library since the last sync
+    """
+
+    def __init__(self):
+        self.added: List[dict] = []
+        """ The saved items which were added since the last sync (newest first) """
+
+        self.removed: List[str] = []
+        """ The ids of the items which were removed (only detected by a reconciliation) """
+
+        self.requests: int = 0
+        """ The number of api requests of the sync """
+
+        self.reconciled: bool = False
+        """ If a full reconciliation was done """
+
+
+class LibrarySync:
+    """
+    Incrementally syncs the saved items of users.
+
+    The saved items are returned by spotify with the newest item first. A sync therefore pages through the library
+    until it reaches the watermark (the added_at timestamp of the newest item of the last sync) and returns only the
+    new items, which usually takes a single request. Removed items are detected by a reconciliation, which checks all
+    known ids with concurrent `contains` requests of 50 ids. It is done if the reconcile interval has passed or if
+    the total number of saved items does not match the known items.
+    """
+
+    def __init__(self, spotify_api_client, kind: str = 'tracks', reconcile_interval: float = 24 * 60 * 60,
+                 auth_token: SpotifyAuthorisationToken = None):
+        """
+        Create a new library sync
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            kind: The kind of saved items (tracks, albums or shows)
+            reconcile_interval: The seconds after which a full reconciliation is done. None disables the periodic
+                reconciliation
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        if kind not in LIBRARY_KINDS:
+            raise SpotifyError(ErrorMessage(message=f'{kind} is not one of {list(LIBRARY_KINDS)}').__dict__)
+
+        self.spotify_api_client = spotify_api_client
+        self.kind: str = kind
+        self.reconcile_interval: Optional[float] = reconcile_interval
+        self.auth_token: SpotifyAuthorisationToken = auth_token
+
+        self.states: Dict[str, LibraryState] = {}
+        """ The state of every synced user, can be persisted with LibraryState.to_dict """
+
+    async def sync(self, user_id: str, auth_token: SpotifyAuthorisationToken = None, reconcile: bool = None,
+                   **kwargs) -> LibraryDelta:
+        """
+        Sync the library of a user
+
+        Args:
+            user_id: The id of the user the auth token belongs to (used as key of the state)
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            reconcile: Force (True) or prevent (False) a full reconciliation. None decides by the reconcile interval
+                and the total number of saved items
+            kwargs: Optional arguments of the library get request as keyword args (e.g. market)
+
+        Returns:
+            The changes since the last sync. The first sync of a user returns the whole library
+        """
+
+        auth_token = auth_token or self.auth_token
+        get_method, _, item_key = LIBRARY_KINDS[self.kind]
+        get_items = getattr(self.spotify_api_client.library, get_method)
+
+        delta = LibraryDelta()
+        state = self.states.get(user_id)
+
+        if state is None:
+            # The whole library is needed, so all pages can be requested concurrently
+            state = self.states[user_id] = LibraryState(reconciled_at=time.time())
+            delta.added, delta.requests = await Endpoint._get_all_items(get_items, auth_token=auth_token, **kwargs)
+            total = len(delta.added)
+            reconcile = False
+        else:
+            total = await self._get_new_items(get_items, state, delta, auth_token, kwargs)
+
+        new_ids = [item[item_key]['id'] for item in delta.added]
+        if delta.added:
+            watermark = delta.added[0]['added_at']
+            watermark_ids = {item[item_key]['id'] for item in delta.added if item['added_at'] == watermark}
+            state.watermark_ids = watermark_ids | (state.watermark_ids if watermark == state.watermark else set())
+            state.watermark = watermark
+        state.saved_ids.update(new_ids)
+
+        if reconcile is None:
+            reconcile = total != len(state.saved_ids) or (
+                    self.reconcile_interval is not None and time.time() - state.reconciled_at > self.reconcile_interval)
+
+        if reconcile:
+            await self._reconcile(state, delta, set(new_ids), auth_token)
+
+        return delta
+
+    async def _get_new_items(self, get_items, state: LibraryState, delta: LibraryDelta,
+                             auth_token: SpotifyAuthorisationToken, kwargs: dict) -> int:
+        """
+        Page through the library until the watermark is reached
+
+        Args:
+            get_items: The library get method
+            state: The state of the user
+            delta: The delta the new items are added to
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments of the library get request
+
+        Returns:
+            The total number of saved items
+        """
+
+        item_key = LIBRARY_KINDS[self.kind][2]
+        offset = 0
+
+        while True:
+            with bypass_projections():
+                page: dict = await get_items(auth_token, limit=50, offset=offset, **kwargs)
+            delta.requests += 1
+
+            for item in page['items']:
+                added_at: str = item['added_at']
+                if state.watermark and (added_at < state.watermark or (
+                        added_at == state.watermark and item[item_key]['id'] in state.watermark_ids)):
+                    return page['total']
+                delta.added.append(item)
+
+            offset += 50
+            if offset >= page['total']:
+                return page['total']
+
+    async def _reconcile(self, state: LibraryState, delta: LibraryDelta, new_ids: Set[str],
+                         auth_token: SpotifyAuthorisationToken) -> None:
+        """
+        Check if all known ids are still saved and remove the ones which are not
+
+        Args:
+            state: The state of the user
+            delta: The delta the removed ids are added to
+            new_ids: The ids which were returned by this sync and are known to be saved
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        contains = getattr(self.spotify_api_client.library, LIBRARY_KINDS[self.kind][1])
+        id_list = sorted(state.saved_ids - new_ids)
+        chunks = list(Endpoint._chunks(id_list, 50))
+
+        responses: List[List[bool]] = await asyncio.gather(*[contains(chunk, auth_token) for chunk in chunks])
+        delta.requests += len(chunks)
+
+        for chunk, saved_list in zip(chunks, responses):
+            delta.removed.extend(item_id for item_id, saved in zip(chunk, saved_list) if not saved)
+
+        state.saved_ids.difference_update(delta.removed)
+        state.watermark_ids.difference_update(delta.removed)
+        state.reconciled_at = time.time()
+        delta.reconciled = True
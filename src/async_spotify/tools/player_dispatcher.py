@@ -0,0 +1,189 @@
+"""
+Dispatcher which debounces and serializes the player commands of every user
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (player_dispatcher.py) is part of AsyncSpotify which is released under MIT.           #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Any
+
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+
+COALESCED_COMMANDS: List[str] = ['play', 'pause', 'seek', 'volume', 'repeat', 'shuffle', 'transfer']
+""" The player commands which set a state, so only the latest pending value of them has to be sent """
+
+
+class PlayerDispatcher:
+    """
+    Sends the player commands of many users.
+
+    The commands of one user are sent one after another in the order they were dispatched, the commands of different
+    users are sent concurrently. Before a command is sent the dispatcher waits for the debounce delay. A new command
+    which sets a state (e.g. volume or seek) replaces a pending command of the same type, so bursts from sliders only
+    send the latest value and the last dispatched command is always sent last. Commands like next or previous are
+    never coalesced.
+    """
+
+    def __init__(self, spotify_api_client, debounce: float = 0.1):
+        """
+        Create a new player dispatcher
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            debounce: The seconds to wait for newer values before a command is sent
+        """
+
+        self.spotify_api_client = spotify_api_client
+        self.debounce: float = debounce
+
+        self.dispatched: int = 0
+        """ The number of dispatched commands """
+
+        self.sent: int = 0
+        """ The number of commands which were sent to spotify """
+
+        self._pending: Dict[str, 'OrderedDict[Tuple, Tuple[tuple, dict, List[asyncio.Future]]]'] = {}
+        self._workers: Dict[str, asyncio.Future] = {}
+        self._counter = itertools.count()
+
+    def dispatch(self, user_id: str, command: str, *args, auth_token: SpotifyAuthorisationToken = None,
+                 **kwargs) -> asyncio.Future:
+        """
+        Dispatch a player command
+
+        Args:
+            user_id: The id of the user (commands with the same user id are serialized)
+            command: The name of the method of the [player endpoint][async_spotify.api._endpoints.player.Player]
+            args: The positional arguments of the command
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: The keyword arguments of the command
+
+        Returns:
+            A future which resolves with the response of the command which was sent in its place
+        """
+
+        future = asyncio.get_event_loop().create_future()
+        pending = self._pending.setdefault(user_id, OrderedDict())
+        self.dispatched += 1
+
+        key = (command,) if command in COALESCED_COMMANDS else (command, next(self._counter))
+        futures: List[asyncio.Future] = pending.pop(key)[2] if key in pending else []
+
+        # The latest value moves to the end, so the last dispatched command is sent last
+        pending[key] = (args, {**kwargs, 'auth_token': auth_token}, futures + [future])
+
+        if user_id not in self._workers:
+            self._workers[user_id] = asyncio.ensure_future(self._run(user_id))
+
+        return future
+
+    def play(self, user_id: str, auth_token: SpotifyAuthorisationToken = None, **kwargs) -> asyncio.Future:
+        """
+        Start or resume the playback
+
+        Args:
+            user_id: The id of the user
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments as keyword args
+
+        Returns:
+            A future which resolves when the command was sent
+        """
+
+        return self.dispatch(user_id, 'play', auth_token=auth_token, **kwargs)
+
+    def pause(self, user_id: str, auth_token: SpotifyAuthorisationToken = None, **kwargs) -> asyncio.Future:
+        """
+        Pause the playback
+
+        Args:
+            user_id: The id of the user
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments as keyword args
+
+        Returns:
+            A future which resolves when the command was sent
+        """
+
+        return self.dispatch(user_id, 'pause', auth_token=auth_token, **kwargs)
+
+    def seek(self, user_id: str, position_ms: int, auth_token: SpotifyAuthorisationToken = None,
+             **kwargs) -> asyncio.Future:
+        """
+        Seek to a position in the current track
+
+        Args:
+            user_id: The id of the user
+            position_ms: The position in milliseconds
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments as keyword args
+
+        Returns:
+            A future which resolves when the latest seek was sent
+        """
+
+        return self.dispatch(user_id, 'seek', position_ms, auth_token=auth_token, **kwargs)
+
+    def volume(self, user_id: str, volume_percent: int, auth_token: SpotifyAuthorisationToken = None,
+               **kwargs) -> asyncio.Future:
+        """
+        Set the volume
+
+        Args:
+            user_id: The id of the user
+            volume_percent: The volume from 0 to 100
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments as keyword args
+
+        Returns:
+            A future which resolves when the latest volume was sent
+        """
+
+        return self.dispatch(user_id, 'volume', volume_percent, auth_token=auth_token, **kwargs)
+
+    async def close(self) -> None:
+        """
+        Wait until all pending commands were sent
+        """
+
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    async def _run(self, user_id: str) -> None:
+        """
+        Send the pending commands of a user one after another
+
+        Args:
+            user_id: The id of the user
+        """
+
+        pending = self._pending[user_id]
+
+        try:
+            while pending:
+                await asyncio.sleep(self.debounce)
+                key, (args, kwargs, futures) = pending.popitem(last=False)
+                method = getattr(self.spotify_api_client.player, key[0])
+
+                self.sent += 1
+                try:
+                    response: Any = await method(*args, **kwargs)
+                except Exception as error:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(error)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(response)
+        finally:
+            del self._workers[user_id]
+            if not pending:
+                del self._pending[user_id]
@@ -0,0 +1,162 @@
+"""
+Cache for the items of playlists which is keyed by the snapshot id of the playlist
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (playlist_cache.py) is part of AsyncSpotify which is released under MIT.              #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Optional, Any
+
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+from ..processing.projection import bypass_projections
+
+
+class PlaylistCache:
+    """
+    Caches the items of playlists by their snapshot id.
+
+    The snapshot id of a playlist only changes if the items of the playlist change. Every lookup of a cached playlist
+    therefore only requests the snapshot id of the playlist and returns the cached items if it did not change.
+    Otherwise the snapshot id and the first page are requested together, the other pages concurrently and the snapshot
+    id is checked again afterwards, so the cached items always belong to their snapshot id. Concurrent lookups of the
+    same playlist share one refetch.
+    """
+
+    def __init__(self, spotify_api_client, max_playlists: int = None, auth_token: SpotifyAuthorisationToken = None):
+        """
+        Create a new playlist cache
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            max_playlists: The maximal number of cached playlists. The least recently used playlist is dropped first.
+                None means unbounded
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        self.spotify_api_client = spotify_api_client
+        self.max_playlists: Optional[int] = max_playlists
+        self.auth_token: SpotifyAuthorisationToken = auth_token
+
+        self.hits: int = 0
+        """ The number of lookups which were answered from the cache """
+
+        self.misses: int = 0
+        """ The number of lookups which had to refetch the items """
+
+        self.requests: int = 0
+        """ The number of api requests """
+
+        self._playlists: 'OrderedDict[Tuple, Tuple[str, List[dict]]]' = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+
+    async def get_tracks(self, playlist_id: str, auth_token: SpotifyAuthorisationToken = None,
+                         **kwargs) -> List[dict]:
+        """
+        Get all items of a playlist
+
+        Args:
+            playlist_id: The id of the playlist
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments of [get_tracks][async_spotify.api._endpoints.playlists.Playlists.get_tracks]
+                as keyword args (e.g. fields or market). Every combination is cached separately
+
+        Returns:
+            The items of all pages of the playlist
+        """
+
+        _, items = await self.get_snapshot(playlist_id, auth_token, **kwargs)
+        return items
+
+    async def get_snapshot(self, playlist_id: str, auth_token: SpotifyAuthorisationToken = None,
+                           **kwargs) -> Tuple[str, List[dict]]:
+        """
+        Get the current snapshot id and all items of a playlist
+
+        Args:
+            playlist_id: The id of the playlist
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: Optional arguments of [get_tracks][async_spotify.api._endpoints.playlists.Playlists.get_tracks]
+                as keyword args (e.g. fields or market). Every combination is cached separately. limit and offset
+                are ignored, because all items are fetched
+
+        Raises:
+            SpotifyError: If the playlist changed while its items were read
+
+        Returns:
+            Tuple(the snapshot id, the items of all pages of the playlist)
+        """
+
+        auth_token = auth_token or self.auth_token
+        kwargs = {name: value for name, value in kwargs.items() if name not in ('limit', 'offset')}
+        key = (playlist_id, tuple(sorted(kwargs.items())))
+
+        cached = self._playlists.get(key)
+        if cached and key not in self._pending:
+            with bypass_projections():
+                playlist: dict = await self.spotify_api_client.playlists.get_one(playlist_id, auth_token,
+                                                                                 fields='snapshot_id')
+            self.requests += 1
+
+            if playlist['snapshot_id'] == cached[0]:
+                self.hits += 1
+                self._playlists.move_to_end(key)
+                return cached
+
+        self.misses += 1
+
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._fetch(key, playlist_id, auth_token, kwargs))
+            self._pending[key].add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(self._pending[key])
+
+    def invalidate(self, playlist_id: str = None) -> None:
+        """
+        Drop a playlist from the cache
+
+        Args:
+            playlist_id: The id of the playlist. None drops every playlist
+        """
+
+        for key in list(self._playlists):
+            if playlist_id is None or key[0] == playlist_id:
+                del self._playlists[key]
+
+    def __len__(self) -> int:
+        return len(self._playlists)
+
+    def __contains__(self, playlist_id: str) -> bool:
+        return any(key[0] == playlist_id for key in self._playlists)
+
+    async def _fetch(self, key: Tuple, playlist_id: str, auth_token: SpotifyAuthorisationToken,
+                     kwargs: Dict[str, Any]) -> Tuple[str, List[dict]]:
+        """
+        Fetch the snapshot id and all pages of a playlist and store them
+
+        Args:
+            key: The cache key of the playlist
+            playlist_id: The id of the playlist
+            auth_token: The auth token if you set the api class not to keep the token in memory
+            kwargs: The optional arguments of the request
+
+        Returns:
+            Tuple(the snapshot id, the items of all pages of the playlist)
+        """
+
+        with bypass_projections():
+            snapshot_id, items, requests = await self.spotify_api_client.playlists._get_items_with_snapshot(
+                playlist_id, auth_token, **kwargs)
+        self.requests += requests
+
+        self._playlists[key] = (snapshot_id, items)
+        self._playlists.move_to_end(key)
+        if self.max_playlists is not None and len(self._playlists) > self.max_playlists:
+            self._playlists.popitem(last=False)
+
+        return snapshot_id, items
@@ -0,0 +1,299 @@
+"""
+Buffer which coalesces library and follow mutations of a user into batches
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (write_coalescer.py) is part of AsyncSpotify which is released under MIT.             #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+from typing import List, Dict, Tuple, Set, Optional
+
+from ..api._endpoints.endpoint import Endpoint
+from ..authentification.spotify_authorization_token import SpotifyAuthorisationToken
+
+WRITE_GROUPS: List[str] = ['tracks', 'albums', 'shows', 'artist', 'user']
+""" The groups of ids which can be coalesced (the saved items and the followed artists or users) """
+
+
+class WriteCoalescer:
+    """
+    Coalesces the library and follow mutations of one user.
+
+    Every mutation is buffered for a short window and then committed together with all other buffered mutations in
+    batches of up to 50 ids. An add and a remove (or follow and unfollow) of the same id which meet in the buffer
+    cancel each other out and are never sent, which assumes that the first one of them changed the state (e.g. a like
+    button which is toggled twice). Every call returns a future which resolves when the batches of its ids were
+    committed or raises the error of the failed batch.
+    """
+
+    def __init__(self, spotify_api_client, window: float = 0.1, batch_size: int = 50,
+                 auth_token: SpotifyAuthorisationToken = None):
+        """
+        Create a new write coalescer
+
+        Args:
+            spotify_api_client: The [`SpotifyApiClient`][async_spotify.api.spotify_api_client] used for the requests
+            window: The seconds a mutation is buffered before the buffer is committed
+            batch_size: The maximal number of ids per request. A full batch commits the buffer immediately
+            auth_token: The auth token if you set the api class not to keep the token in memory
+        """
+
+        self.spotify_api_client = spotify_api_client
+        self.window: float = window
+        self.batch_size: int = batch_size
+        self.auth_token: SpotifyAuthorisationToken = auth_token
+
+        self.operations: int = 0
+        """ The number of mutated ids """
+
+        self.cancelled: int = 0
+        """ The number of mutated ids which cancelled each other out """
+
+        self.requests: int = 0
+        """ The number of api requests """
+
+        self._pending: Dict[str, Dict[str, Tuple[bool, List[asyncio.Future]]]] = {group: {} for group in WRITE_GROUPS}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_requested: bool = False
+        self._flush_tasks: Set[asyncio.Future] = set()
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+    def add_tracks(self, track_id_list: List[str]) -> asyncio.Future:
+        """
+        Save tracks
+
+        Args:
+            track_id_list: The ids of the tracks
+
+        Returns:
+            A future which resolves when the tracks are saved
+        """
+
+        return self._enqueue('tracks', True, track_id_list)
+
+    def remove_tracks(self, track_id_list: List[str]) -> asyncio.Future:
+        """
+        Remove saved tracks
+
+        Args:
+            track_id_list: The ids of the tracks
+
+        Returns:
+            A future which resolves when the tracks are removed
+        """
+
+        return self._enqueue('tracks', False, track_id_list)
+
+    def add_albums(self, album_id_list: List[str]) -> asyncio.Future:
+        """
+        Save albums
+
+        Args:
+            album_id_list: The ids of the albums
+
+        Returns:
+            A future which resolves when the albums are saved
+        """
+
+        return self._enqueue('albums', True, album_id_list)
+
+    def remove_albums(self, album_id_list: List[str]) -> asyncio.Future:
+        """
+        Remove saved albums
+
+        Args:
+            album_id_list: The ids of the albums
+
+        Returns:
+            A future which resolves when the albums are removed
+        """
+
+        return self._enqueue('albums', False, album_id_list)
+
+    def add_shows(self, show_id_list: List[str]) -> asyncio.Future:
+        """
+        Save shows
+
+        Args:
+            show_id_list: The ids of the shows
+
+        Returns:
+            A future which resolves when the shows are saved
+        """
+
+        return self._enqueue('shows', True, show_id_list)
+
+    def remove_shows(self, show_id_list: List[str]) -> asyncio.Future:
+        """
+        Remove saved shows
+
+        Args:
+            show_id_list: The ids of the shows
+
+        Returns:
+            A future which resolves when the shows are removed
+        """
+
+        return self._enqueue('shows', False, show_id_list)
+
+    def follow_artist_or_user(self, follow_type: str, spotify_id_list: List[str]) -> asyncio.Future:
+        """
+        Follow artists or users
+
+        Args:
+            follow_type: The follow type (user or artist)
+            spotify_id_list: The ids of the artists or users
+
+        Returns:
+            A future which resolves when the artists or users are followed
+        """
+
+        return self._enqueue(follow_type, True, spotify_id_list)
+
+    def unfollow_artist_or_user(self, follow_type: str, spotify_id_list: List[str]) -> asyncio.Future:
+        """
+        Unfollow artists or users
+
+        Args:
+            follow_type: The follow type (user or artist)
+            spotify_id_list: The ids of the artists or users
+
+        Returns:
+            A future which resolves when the artists or users are unfollowed
+        """
+
+        return self._enqueue(follow_type, False, spotify_id_list)
+
+    async def flush(self) -> None:
+        """
+        Commit all buffered mutations now. Flushes run one after another, so the mutations of an id are applied in the
+        order they were made
+        """
+
+        # Mutations which are buffered while an earlier flush is in flight wait for it, otherwise a remove could
+        # overtake the add of the same id
+        async with self._flush_lock:
+            if self._flush_handle:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._flush_requested = False
+
+            batches = []
+            for group in WRITE_GROUPS:
+                pending, self._pending[group] = self._pending[group], {}
+
+                for add in (True, False):
+                    items = [(item_id, futures) for item_id, (is_add, futures) in pending.items() if is_add == add]
+                    batches.extend(self._commit(group, add, chunk)
+                                   for chunk in Endpoint._chunks(items, self.batch_size))
+
+            await asyncio.gather(*batches)
+
+    def _enqueue(self, group: str, add: bool, id_list: List[str]) -> asyncio.Future:
+        """
+        Buffer a mutation
+
+        Args:
+            group: The group of the ids
+            add: If the ids are added (or followed) or removed (or unfollowed)
+            id_list: The ids
+
+        Returns:
+            A future which resolves when all ids were committed
+        """
+
+        loop = asyncio.get_event_loop()
+        pending = self._pending[group]
+        futures: List[asyncio.Future] = []
+
+        for item_id in id_list:
+            future = loop.create_future()
+            futures.append(future)
+            self.operations += 1
+
+            if item_id not in pending:
+                pending[item_id] = (add, [future])
+            elif pending[item_id][0] == add:
+                pending[item_id][1].append(future)
+            else:
+                # An add and a remove of the same id cancel each other out
+                _, cancelled_futures = pending.pop(item_id)
+                self.cancelled += len(cancelled_futures) + 1
+                self._resolve(cancelled_futures + [future])
+
+        if not self._flush_requested:
+            if any(sum(1 for is_add, _ in pending.values() if is_add == direction) >= self.batch_size
+                   for direction in (True, False)):
+                self._schedule_flush()
+            elif not self._flush_handle:
+                self._flush_handle = loop.call_later(self.window, self._schedule_flush)
+
+        return asyncio.gather(*futures)
+
+    def _schedule_flush(self) -> None:
+        """
+        Start a flush in the background
+        """
+
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._flush_requested = True
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _commit(self, group: str, add: bool, items: List[Tuple[str, List[asyncio.Future]]]) -> None:
+        """
+        Send one batch and resolve the futures of its ids
+
+        Args:
+            group: The group of the ids
+            add: If the ids are added (or followed) or removed (or unfollowed)
+            items: The ids with the futures of their callers
+        """
+
+        library = self.spotify_api_client.library
+        follow = self.spotify_api_client.follow
+        id_list = [item_id for item_id, _ in items]
+        futures = [future for _, item_futures in items for future in item_futures]
+
+        self.requests += 1
+        try:
+            if group == 'tracks':
+                await (library.add_tracks if add else library.remove_tracks)(id_list, self.auth_token)
+            elif group == 'albums':
+                await (library.add_album if add else library.remove_albums)(id_list, self.auth_token)
+            elif group == 'shows':
+                await (library.add_shows if add else library.remove_shows)(id_list, self.auth_token)
+            else:
+                await (follow.follow_artist_or_user if add else follow.unfollow_artist_or_user)(group, id_list,
+                                                                                               self.auth_token)
+        except Exception as error:
+            self._resolve(futures, error)
+            return
+
+        self._resolve(futures)
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], error: Exception = None) -> None:
+        """
+        Resolve the futures of callers which did not cancel them
+
+        Args:
+            futures: The futures
+            error: The error the futures should raise. None resolves them successfully
+        """
+
+        for future in futures:
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
@@ -22,6 +22,7 @@ setuptools.setup(
     url="https://github.com/niclashaderer/AsyncSpotify",
     keywords=["Spotify", "Async", "API", "Wrapper", "AioHttp"],
     install_requires=["aiohttp>=3.6.2", "aiodns>=2.0.0"],
+    extras_require={"numpy": ["numpy>=1.17"]},
     classifiers=[
         "Intended Audience :: Developers",
         "Natural Language :: English",
@@ -31,5 +32,5 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
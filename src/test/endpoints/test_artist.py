@@ -38,3 +38,14 @@ class TestArtist:
     async def test_similar(self, prepared_api: SpotifyApiClient):
         artist_similar = await prepared_api.artists.get_similar('1YEGETLT2p8k97LIo3deHL')
         assert isinstance(artist_similar, dict) and artist_similar
+
+    @pytest.mark.asyncio
+    async def test_discography(self, prepared_api: SpotifyApiClient):
+        album_list = await prepared_api.artists.get_album_list('1YEGETLT2p8k97LIo3deHL', include_groups='album')
+        discography = [album async for album in prepared_api.artists.get_discography(
+            '1YEGETLT2p8k97LIo3deHL', hydrate_tracks=True, include_groups='album')]
+
+        assert len(discography) == album_list['total']
+        for album in discography:
+            assert len(album['tracks']['items']) == album['tracks']['total']
+            assert all('popularity' in track for track in album['tracks']['items'])
@@ -8,10 +8,12 @@ Test the player endpoint
 #  You are not allowed to use this code or this file for another project without                   #
 #  linking to the original source.                                                                 #
 # ##################################################################################################
+import asyncio
+
 import pytest
 
 from async_spotify import SpotifyApiClient
-from async_spotify.spotify_errors import SpotifyAPIError
+from async_spotify.spotify_errors import SpotifyAPIError, SpotifyError
 
 
 class TestPlayer:
@@ -45,22 +47,19 @@ class TestPlayer:
 
     @pytest.mark.asyncio
     async def test_add_multiple_to_queue(self, prepared_api: SpotifyApiClient):
-        try:
-            await prepared_api.player.add_multiple_tracks_to_queue(
-                ['spotify:track:4iV5W9uYEdYUVa79Axb7Rh',
-                 'spotify:track:4iV5W9uYEdYUVa79Axb7Rh',
-                 'spotify:track:4iV5W9uYEdYUVa79Axb7Rh',
-                 'spotify:track:4iV5W9uYEdYUVa79Axb7Rh'])
-            response: None = await prepared_api.player.add_multiple_tracks_to_queue(
-                ['spotify:track:3RauEVgRgj1IuWdJ9fDs70',
-                 'spotify:track:3RauEVgRgj1IuWdJ9fDs70',
-                 'spotify:track:3RauEVgRgj1IuWdJ9fDs70'])
-        except SpotifyAPIError as e:
-            error = e.get_json()
-            assert error['error']['status'] == 404
+        results = await prepared_api.player.add_multiple_tracks_to_queue(
+            ['spotify:track:4iV5W9uYEdYUVa79Axb7Rh',
+             'spotify:track:3RauEVgRgj1IuWdJ9fDs70',
+             'spotify:track:4iV5W9uYEdYUVa79Axb7Rh'])
+        assert len(results) == 3
+
+        if results[0] is not None:
+            # No active device
+            assert results[0].get_json()['error']['status'] == 404
+            assert all(isinstance(result, SpotifyError) for result in results[1:])
             return
 
-        assert not response
+        assert results == [None, None, None]
 
     @pytest.mark.asyncio
     async def test_current_track(self, prepared_api: SpotifyApiClient):
@@ -87,6 +86,25 @@ class TestPlayer:
         current_track = await prepared_api.player.get_current_track()
         assert current_track["item"]["album"]["uri"] == "spotify:album:5ht7ItJgpBH7W6vJ5BqpPr"
 
+    @pytest.mark.asyncio
+    async def test_watch(self, prepared_api: SpotifyApiClient):
+        try:
+            await prepared_api.player.play(context_uri="spotify:album:5ht7ItJgpBH7W6vJ5BqpPr")
+        except SpotifyAPIError as e:
+            error = e.get_json()
+            assert error['error']['status'] == 404
+            return
+
+        watcher = prepared_api.player.watch(playing_interval=1)
+        event = await asyncio.wait_for(watcher.__anext__(), 10)
+        assert event['type'] == 'track_change'
+        assert event['previous'] is None
+
+        await prepared_api.player.pause()
+        event = await asyncio.wait_for(watcher.__anext__(), 30)
+        assert event['type'] == 'pause'
+        await watcher.aclose()
+
     @pytest.mark.asyncio
     async def test_invalid_device_queue(self, prepared_api: SpotifyApiClient):
         with pytest.raises(SpotifyAPIError):
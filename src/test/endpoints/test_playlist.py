@@ -31,7 +31,7 @@ class TestPlaylist:
 
         uris: List[str] = ['spotify:track:7FIWs0pqAYbP91WWM0vlTQ', 'spotify:track:40YbWniIEmqy6s58fYXLUh']
         songs = await prepared_api.playlists.add_tracks(playlist_id, uris, position=0)
-        assert songs is None
+        assert 'snapshot_id' in songs
 
         details = await prepared_api.playlists.change_details(playlist_id, name='test_playlist_x')
         assert details is None
@@ -64,12 +64,12 @@ class TestPlaylist:
         assert isinstance(reorder_return, dict)
 
         replace = await prepared_api.playlists.replace_tracks(playlist_id, ['spotify:track:3kW5Rq9AIL0QQuYTSKNkQw'])
-        assert replace is None
+        assert 'snapshot_id' in replace
 
         remove = await prepared_api.playlists.remove_tracks(playlist_id,
                                                             {'tracks': [
                                                                {'uri': 'spotify:track:3kW5Rq9AIL0QQuYTSKNkQw'}]})
-        assert remove is None
+        assert 'snapshot_id' in remove
 
         image = 'https://upload.wikimedia.org/wikipedia/commons/thumb/8/8e/' \
                 'Spotify_logo_vertical_white.jpg/196px-Spotify_logo_vertical_white.jpg'
@@ -84,3 +84,65 @@ class TestPlaylist:
         assert image is None
 
         await prepared_api.follow.unfollow_playlist(playlist_id)
+
+    @pytest.mark.asyncio
+    async def test_large_track_lists(self, prepared_api: SpotifyApiClient):
+        me = await prepared_api.user.me()
+        playlist = await prepared_api.playlists.create_playlist(me['id'], 'test_playlist_large')
+        playlist_id = playlist['id']
+
+        uris: List[str] = ['spotify:track:7FIWs0pqAYbP91WWM0vlTQ'] * 150 + ['spotify:track:40YbWniIEmqy6s58fYXLUh'] * 100
+        replace = await prepared_api.playlists.replace_tracks(playlist_id, uris)
+        assert 'snapshot_id' in replace
+
+        add = await prepared_api.playlists.add_tracks(playlist_id, ['spotify:track:3kW5Rq9AIL0QQuYTSKNkQw'] * 120,
+                                                      position=150)
+        assert 'snapshot_id' in add
+
+        tracks = await prepared_api.playlists.get_tracks(playlist_id, offset=140, limit=20)
+        assert tracks['total'] == 370
+        assert tracks['items'][9]['track']['uri'] == 'spotify:track:7FIWs0pqAYbP91WWM0vlTQ'
+        assert tracks['items'][10]['track']['uri'] == 'spotify:track:3kW5Rq9AIL0QQuYTSKNkQw'
+
+        await prepared_api.follow.unfollow_playlist(playlist_id)
+
+    @pytest.mark.asyncio
+    async def test_sync(self, prepared_api: SpotifyApiClient):
+        me = await prepared_api.user.me()
+        playlist = await prepared_api.playlists.create_playlist(me['id'], 'test_playlist_sync')
+        playlist_id = playlist['id']
+
+        first, second, third = ['spotify:track:7FIWs0pqAYbP91WWM0vlTQ', 'spotify:track:40YbWniIEmqy6s58fYXLUh',
+                                'spotify:track:3kW5Rq9AIL0QQuYTSKNkQw']
+        await prepared_api.playlists.replace_tracks(playlist_id, [first] * 120 + [second, third])
+
+        desired: List[str] = [third] + [first] * 110 + [second] * 2
+        result = await prepared_api.playlists.sync(playlist_id, desired)
+        assert result['removed'] == 10
+        assert result['moved'] == 1
+        assert result['added'] == 1
+        assert result['api_calls'] < result['replace_api_calls'] + 5
+
+        tracks = await prepared_api.playlists.get_tracks(playlist_id, limit=100, offset=100)
+        assert tracks['total'] == len(desired)
+        assert [item['track']['uri'] for item in tracks['items']] == desired[100:]
+
+        await prepared_api.follow.unfollow_playlist(playlist_id)
+
+    @pytest.mark.asyncio
+    async def test_sort(self, prepared_api: SpotifyApiClient):
+        me = await prepared_api.user.me()
+        playlist = await prepared_api.playlists.create_playlist(me['id'], 'test_playlist_sort')
+        playlist_id = playlist['id']
+
+        uris: List[str] = ['spotify:track:3kW5Rq9AIL0QQuYTSKNkQw', 'spotify:track:40YbWniIEmqy6s58fYXLUh',
+                           'spotify:track:7FIWs0pqAYbP91WWM0vlTQ']
+        await prepared_api.playlists.replace_tracks(playlist_id, uris * 2)
+
+        result = await prepared_api.playlists.sort(playlist_id, key=lambda item: item['track']['uri'])
+        assert result['moved'] <= 3
+
+        tracks = await prepared_api.playlists.get_tracks(playlist_id)
+        assert [item['track']['uri'] for item in tracks['items']] == sorted(uris * 2)
+
+        await prepared_api.follow.unfollow_playlist(playlist_id)
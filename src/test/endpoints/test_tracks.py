@@ -8,9 +8,11 @@ Test tracks endpoint
 #  You are not allowed to use this code or this file for another project without                   #
 #  linking to the original source.                                                                 #
 # ##################################################################################################
+import numpy as np
 import pytest
 
 from async_spotify import SpotifyApiClient
+from async_spotify.audio import AudioAnalysis, AudioFeatures, SimilarityIndex
 
 
 class TestShow:
@@ -20,6 +22,13 @@ class TestShow:
         track = await prepared_api.track.audio_analyze('7FIWs0pqAYbP91WWM0vlTQ')
         assert isinstance(track, dict)
 
+    @pytest.mark.asyncio
+    async def test_analyze_arrays(self, prepared_api: SpotifyApiClient):
+        analysis = await prepared_api.track.audio_analyze_arrays('7FIWs0pqAYbP91WWM0vlTQ')
+        assert isinstance(analysis, AudioAnalysis)
+        assert analysis.segments.pitches.shape == (len(analysis.segments), 12)
+        assert analysis.segments.index_at(float(analysis.segments.start[1])) == 1
+
     @pytest.mark.asyncio
     async def test_features(self, prepared_api: SpotifyApiClient):
         track = await prepared_api.track.audio_features('7FIWs0pqAYbP91WWM0vlTQ')
@@ -30,6 +39,38 @@ class TestShow:
         track = await prepared_api.track.several_audio_features(['7FIWs0pqAYbP91WWM0vlTQ', '7lQ8MOhq6IN2w8EYcFNSUk'])
         assert isinstance(track, dict)
 
+    @pytest.mark.asyncio
+    async def test_features_matrix(self, prepared_api: SpotifyApiClient):
+        track_id_list = ['7FIWs0pqAYbP91WWM0vlTQ', '7lQ8MOhq6IN2w8EYcFNSUk'] * 60
+        features = await prepared_api.track.audio_features_matrix(track_id_list)
+        assert isinstance(features, AudioFeatures)
+        assert len(features['tempo']) == 120 and not features.missing.any()
+        assert features.summary(['7FIWs0pqAYbP91WWM0vlTQ'])['tempo']['count'] == 1
+
+    @pytest.mark.asyncio
+    async def test_similarity_index(self, prepared_api: SpotifyApiClient):
+        features = await prepared_api.track.audio_features_matrix(['7FIWs0pqAYbP91WWM0vlTQ', '7lQ8MOhq6IN2w8EYcFNSUk',
+                                                                   '4iV5W9uYEdYUVa79Axb7Rh'])
+        index = SimilarityIndex()
+        index.add(features)
+        assert len(index) == 3
+        nearest = index.nearest(['7FIWs0pqAYbP91WWM0vlTQ'], k=2)
+        assert len(nearest[0]) == 2 and '7FIWs0pqAYbP91WWM0vlTQ' not in dict(nearest[0])
+
+    def test_similarity_index_chunks(self):
+        # One query per chunk returns the same neighbours as all queries at once
+        whole, chunked = SimilarityIndex(), SimilarityIndex(max_query_distances=1)
+        track_ids = [f'{index:022d}' for index in range(500)]
+        vectors = np.random.default_rng(0).random((500, len(whole.columns))) * 100
+
+        whole.add_vectors(track_ids, vectors)
+        chunked.add_vectors(track_ids, vectors)
+
+        expected = whole.nearest(track_ids[:20], k=3)
+        result = chunked.nearest(track_ids[:20], k=3)
+        assert [[track_id for track_id, _ in row] for row in result] == \
+               [[track_id for track_id, _ in row] for row in expected]
+
     @pytest.mark.asyncio
     async def test_several(self, prepared_api: SpotifyApiClient):
         track = await prepared_api.track.get_several(['7FIWs0pqAYbP91WWM0vlTQ', '7lQ8MOhq6IN2w8EYcFNSUk'])
@@ -0,0 +1,48 @@
+"""
+Test the related artists crawler
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_artist_crawler.py) is part of AsyncSpotify which is released under MIT.         #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.spotify_errors import SpotifyError
+from async_spotify.tools import ArtistCrawler
+
+
+class TestArtistCrawler:
+
+    def test_checkpoint_interval(self, prepared_api: SpotifyApiClient):
+        with pytest.raises(SpotifyError):
+            ArtistCrawler(prepared_api, checkpoint_interval=0)
+
+    @pytest.mark.asyncio
+    async def test_crawl(self, prepared_api: SpotifyApiClient):
+        crawler = ArtistCrawler(prepared_api, max_depth=1)
+        artists = [(artist, depth) async for artist, depth in crawler.crawl(['0OdUWJ0sBjDrqHygGUXeCF'])]
+
+        assert artists[0][0]['id'] == '0OdUWJ0sBjDrqHygGUXeCF' and artists[0][1] == 0
+        assert all(depth == 1 for _, depth in artists[1:])
+        assert len({artist['id'] for artist, _ in artists}) == len(artists)
+        assert crawler.progress.expanded == 1
+
+    @pytest.mark.asyncio
+    async def test_resume(self, prepared_api: SpotifyApiClient, tmp_path):
+        checkpoint_path = str(tmp_path / 'crawl')
+        crawler = ArtistCrawler(prepared_api, max_depth=2, checkpoint_path=checkpoint_path, checkpoint_interval=1)
+
+        first_run = crawler.crawl(['0OdUWJ0sBjDrqHygGUXeCF'])
+        async for _, depth in first_run:
+            if depth == 1:
+                break
+        await first_run.aclose()
+
+        resumed = [artist async for artist, _ in ArtistCrawler(prepared_api, max_depth=2,
+                                                               checkpoint_path=checkpoint_path).crawl([])]
+        assert resumed
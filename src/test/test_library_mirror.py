@@ -0,0 +1,37 @@
+"""
+Test the local mirror of the library
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_library_mirror.py) is part of AsyncSpotify which is released under MIT.         #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.tools import LibraryMirror
+
+
+class TestLibraryMirror:
+
+    @pytest.mark.asyncio
+    async def test_contains(self, prepared_api: SpotifyApiClient):
+        track_id = '3kW5Rq9AIL0QQuYTSKNkQw'
+        mirror = LibraryMirror(prepared_api)
+        await mirror.remove_tracks([track_id])
+
+        assert not mirror.is_warm('tracks')
+        assert await mirror.contains_tracks([track_id] * 60) == [False] * 60
+
+        await mirror.refresh('tracks')
+        assert mirror.is_warm('tracks')
+
+        await mirror.add_tracks([track_id])
+        assert await mirror.contains_tracks([track_id]) == [True]
+        assert await prepared_api.library.contains_tracks([track_id]) == [True]
+
+        await mirror.remove_tracks([track_id])
+        assert await mirror.contains_tracks([track_id]) == [False]
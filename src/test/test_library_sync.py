@@ -0,0 +1,40 @@
+"""
+Test the incremental library sync
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_library_sync.py) is part of AsyncSpotify which is released under MIT.           #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.tools import LibrarySync, LibraryState
+
+
+class TestLibrarySync:
+
+    @pytest.mark.asyncio
+    async def test_delta_sync(self, prepared_api: SpotifyApiClient):
+        track_id = '3kW5Rq9AIL0QQuYTSKNkQw'
+        await prepared_api.library.remove_tracks([track_id])
+
+        library_sync = LibrarySync(prepared_api, kind='tracks')
+        await library_sync.sync('me')
+
+        delta = await library_sync.sync('me')
+        assert delta.added == [] and delta.requests == 1
+
+        await prepared_api.library.add_tracks([track_id])
+        delta = await library_sync.sync('me')
+        assert [item['track']['id'] for item in delta.added] == [track_id]
+
+        await prepared_api.library.remove_tracks([track_id])
+        delta = await library_sync.sync('me', reconcile=True)
+        assert delta.removed == [track_id] and delta.reconciled
+
+        state = LibraryState.from_dict(library_sync.states['me'].to_dict())
+        assert track_id not in state.saved_ids
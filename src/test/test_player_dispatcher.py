@@ -0,0 +1,41 @@
+"""
+Test the debouncing player dispatcher
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_player_dispatcher.py) is part of AsyncSpotify which is released under MIT.      #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.spotify_errors import SpotifyAPIError
+from async_spotify.tools import PlayerDispatcher
+
+
+class TestPlayerDispatcher:
+
+    @pytest.mark.asyncio
+    async def test_coalesce_volume(self, prepared_api: SpotifyApiClient):
+        dispatcher = PlayerDispatcher(prepared_api)
+        futures = [dispatcher.volume('me', volume) for volume in range(0, 60, 10)]
+
+        try:
+            await asyncio.gather(*futures)
+        except SpotifyAPIError as e:
+            error = e.get_json()
+            assert error['error']['status'] == 404
+            return
+        finally:
+            await dispatcher.close()
+
+        assert dispatcher.dispatched == 6
+        assert dispatcher.sent == 1
+
+        playback = await prepared_api.player.get_queue()
+        assert playback['device']['volume_percent'] == 50
@@ -0,0 +1,43 @@
+"""
+Test the snapshot keyed playlist cache
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_playlist_cache.py) is part of AsyncSpotify which is released under MIT.         #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.tools import PlaylistCache
+
+
+class TestPlaylistCache:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_cache(self, prepared_api: SpotifyApiClient):
+        me = await prepared_api.user.me()
+        playlist = await prepared_api.playlists.create_playlist(me['id'], 'test_playlist_cache')
+        playlist_id = playlist['id']
+        await prepared_api.playlists.replace_tracks(playlist_id, ['spotify:track:7FIWs0pqAYbP91WWM0vlTQ'] * 150)
+
+        cache = PlaylistCache(prepared_api)
+        items = await cache.get_tracks(playlist_id)
+        assert len(items) == 150
+        assert cache.misses == 1 and cache.requests == 3
+
+        assert await cache.get_tracks(playlist_id) == items
+        assert cache.hits == 1 and cache.requests == 4
+
+        await prepared_api.playlists.add_tracks(playlist_id, ['spotify:track:3kW5Rq9AIL0QQuYTSKNkQw'])
+        items = await cache.get_tracks(playlist_id)
+        assert len(items) == 151
+        assert cache.misses == 2
+
+        cache.invalidate(playlist_id)
+        assert playlist_id not in cache
+
+        await prepared_api.follow.unfollow_playlist(playlist_id)
@@ -0,0 +1,209 @@
+"""
+Test the request policies
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_request_policies.py) is part of AsyncSpotify which is released under MIT.       #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+
+import pytest
+from aiohttp import ClientTimeout
+
+from async_spotify import SpotifyApiClient
+from async_spotify.api._endpoints.urls import URLS
+from async_spotify.policies import get_endpoint_group, RequestScheduler, PriorityClass, FairQueue, \
+    RetryPolicy, CircuitBreaker, HedgingPolicy, TimeoutPolicy, deadline, get_remaining_time
+from async_spotify.spotify_errors import CircuitOpenError, DeadlineExceeded, SpotifyError
+
+
+class TestRequestPolicies:
+
+    def test_endpoint_groups(self):
+        assert get_endpoint_group(URLS.PLAYER.PLAY) == 'player'
+        assert get_endpoint_group(URLS.USER.ME) == 'user'
+        assert get_endpoint_group(URLS.LIBRARY.CONTAINS_TRACK) == 'library'
+        assert get_endpoint_group(URLS.PLAYLIST.USER) == 'playlists'
+        assert get_endpoint_group(URLS.TRACKS.SEVERAL) == 'catalog'
+
+    @pytest.mark.asyncio
+    async def test_priority_scheduling(self):
+        scheduler = RequestScheduler([PriorityClass('interactive', 0, 2), PriorityClass('bulk', 1, 2)],
+                                     max_concurrency=2, starvation_limit=2)
+        order = []
+
+        async def request(url: str, name: str):
+            async with scheduler.slot(url):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        bulk = [asyncio.ensure_future(request(URLS.TRACKS.SEVERAL, 'bulk')) for _ in range(6)]
+        await asyncio.sleep(0)
+        interactive = [asyncio.ensure_future(request(URLS.PLAYER.PLAY, 'interactive')) for _ in range(4)]
+        await asyncio.gather(*bulk, *interactive)
+
+        # The interactive requests overtake the queued bulk requests, which are still served every few slots
+        assert order[:2] == ['bulk', 'bulk']
+        assert order[2:4] == ['interactive', 'interactive']
+        assert 'bulk' in order[4:6]
+        assert scheduler.stats()['bulk']['sent'] == 6 and scheduler.running == 0
+
+        with scheduler.priority('interactive'):
+            assert scheduler.classify(URLS.TRACKS.SEVERAL).name == 'interactive'
+
+    @pytest.mark.asyncio
+    async def test_scheduled_client(self, prepared_api: SpotifyApiClient):
+        scheduler = RequestScheduler()
+        prepared_api._api_request_handler.request_scheduler = scheduler
+
+        await asyncio.gather(prepared_api.user.me(), prepared_api.track.get_one('3kW5Rq9AIL0QQuYTSKNkQw'))
+        assert scheduler.stats()['interactive']['sent'] == 1
+        assert scheduler.stats()['bulk']['sent'] == 1
+
+    @pytest.mark.asyncio
+    async def test_fair_queue(self):
+        fair_queue = FairQueue(weights={'light': 2}, max_concurrency=1)
+        order = []
+
+        async def request(tenant: str):
+            with fair_queue.tenant(tenant):
+                async with fair_queue.slot():
+                    order.append(tenant)
+                    await asyncio.sleep(0)
+
+        heavy = [asyncio.ensure_future(request('heavy')) for _ in range(20)]
+        await asyncio.sleep(0)
+        light = [asyncio.ensure_future(request('light')) for _ in range(4)]
+        await asyncio.gather(*heavy, *light)
+
+        # The light tenant gets two of every three slots while both tenants have waiting requests
+        assert order[:8].count('light') == 4
+        assert fair_queue.stats()['heavy']['sent'] == 20
+        assert fair_queue.stats()['light']['queued'] == 0
+
+    @pytest.mark.asyncio
+    async def test_fair_queue_limits(self):
+        with pytest.raises(SpotifyError):
+            FairQueue(weights={'light': 0})
+
+        fair_queue = FairQueue(weights={'heavy': 5}, concurrency={'heavy': 1})
+        fair_queue.weights['broken'] = -1
+        with fair_queue.tenant('broken'):
+            with pytest.raises(SpotifyError):
+                async with fair_queue.slot():
+                    pass
+
+        async def request(tenant: str):
+            with fair_queue.tenant(tenant):
+                async with fair_queue.slot():
+                    await asyncio.sleep(0)
+
+        requests = [asyncio.ensure_future(request(tenant)) for tenant in ['heavy'] * 3 + ['light']]
+        await asyncio.sleep(0)
+
+        # A tenant which reached its concurrency does not save up its deficit for a burst
+        assert fair_queue.tenants['heavy'].running == 1 and fair_queue.tenants['heavy'].deficit == 0
+        await asyncio.gather(*requests)
+        assert fair_queue.stats()['heavy']['sent'] == 3
+
+    def test_retry_policy(self):
+        retry_policy = RetryPolicy(max_retries=2, base_delay=1, budget_ratio=0.5, max_budget=2)
+
+        assert retry_policy.is_retryable_status(503) and not retry_policy.is_retryable_status(404)
+        assert not retry_policy.should_retry('POST', 0, '503')
+        assert retry_policy.should_retry('GET', 0, '503')
+        assert retry_policy.should_retry('GET', 1, 'TimeoutError')
+        assert not retry_policy.should_retry('GET', 2, '503')
+
+        # The budget is used up and only refilled by new requests
+        assert not retry_policy.should_retry('GET', 0, '503')
+        retry_policy.record_request()
+        retry_policy.record_request()
+        assert retry_policy.should_retry('GET', 0, '502')
+
+        assert retry_policy.stats()['reasons'] == {'503': 1, 'TimeoutError': 1, '502': 1}
+        assert retry_policy.budget_exhausted == 1
+        assert all(0 <= retry_policy.backoff(3) <= 8 for _ in range(100))
+
+    def test_circuit_breaker(self):
+        circuit_breaker = CircuitBreaker(minimum_requests=4, open_duration=0, half_open_probes=1)
+
+        for success in [True, False, False, True]:
+            group, probe = circuit_breaker.before_request(URLS.TRACKS.SEVERAL)
+            circuit_breaker.record(group, probe, success)
+
+        assert circuit_breaker.state('catalog') == 'open'
+        assert circuit_breaker.state('player') == 'closed'
+
+        # The open duration is over, so the next request is a probe and all other requests fail fast
+        group, probe = circuit_breaker.before_request(URLS.TRACKS.SEVERAL)
+        assert probe and circuit_breaker.state('catalog') == 'half_open'
+        with pytest.raises(CircuitOpenError):
+            circuit_breaker.before_request(URLS.TRACKS.ONE)
+
+        circuit_breaker.record(group, probe, True)
+        assert circuit_breaker.state('catalog') == 'closed'
+        assert circuit_breaker.stats()['catalog']['rejected'] == 1
+
+    def test_hedging_policy(self):
+        hedging_policy = HedgingPolicy(min_delay=0, max_delay=1, budget_ratio=0.5, max_budget=1, min_samples=4)
+
+        assert hedging_policy.is_hedgeable('get') and not hedging_policy.is_hedgeable('POST')
+
+        # Without enough samples the policy waits for the max delay
+        assert hedging_policy.delay(URLS.TRACKS.SEVERAL) == 1
+        for latency in [0.1, 0.2, 0.3, 0.4]:
+            hedging_policy.record_latency(URLS.TRACKS.SEVERAL, latency)
+
+        assert hedging_policy.delay(URLS.TRACKS.SEVERAL) == 0.4
+        assert hedging_policy.delay(URLS.PLAYER.PAUSE) == 1
+
+        # The budget only allows one hedge
+        assert hedging_policy.try_hedge()
+        assert not hedging_policy.try_hedge()
+        assert hedging_policy.stats()['budget_exhausted'] == 1
+
+    def test_hedging_policy_cache(self):
+        hedging_policy = HedgingPolicy(percentile=1, min_delay=0, max_delay=10, min_samples=4)
+        for _ in range(38):
+            hedging_policy.record_latency(URLS.TRACKS.SEVERAL, 0.1)
+        assert hedging_policy.delay(URLS.TRACKS.SEVERAL) == 0.1
+
+        # The percentile is only computed again after a twentieth of the latencies were replaced
+        hedging_policy.record_latency(URLS.TRACKS.SEVERAL, 5)
+        assert hedging_policy.delay(URLS.TRACKS.SEVERAL) == 0.1
+        hedging_policy.record_latency(URLS.TRACKS.SEVERAL, 0.1)
+        assert hedging_policy.delay(URLS.TRACKS.SEVERAL) == 5
+
+    def test_timeout_policy(self):
+        timeout_policy = TimeoutPolicy({'player': ClientTimeout(total=2, connect=1, sock_read=1)})
+
+        assert timeout_policy.timeout(URLS.PLAYER.PAUSE).total == 2
+        assert timeout_policy.timeout(URLS.TRACKS.SEVERAL).total == 30
+
+        assert get_remaining_time() is None
+        with deadline(10):
+            # Nested deadlines can only shorten the outer deadline
+            with deadline(20):
+                assert get_remaining_time() <= 10
+
+            timeout = timeout_policy.timeout(URLS.TRACKS.SEVERAL)
+            assert timeout.total <= 10 and timeout.sock_read == 20
+
+        assert get_remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_client(self, prepared_api: SpotifyApiClient):
+        prepared_api._api_request_handler.timeout_policy = TimeoutPolicy()
+
+        with deadline(10):
+            track = await prepared_api.track.get_one('0sTlGEld0zz9Ldq4rAjLbR')
+            assert track['id'] == '0sTlGEld0zz9Ldq4rAjLbR'
+
+        with deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                await prepared_api.track.get_one('0sTlGEld0zz9Ldq4rAjLbR')
@@ -0,0 +1,89 @@
+"""
+Test the response processors
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_response_processors.py) is part of AsyncSpotify which is released under MIT.    #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.api._endpoints.endpoint import Endpoint
+from async_spotify.processing import MarketMask, MarketCompactor, Projection, EntityStore
+
+
+class TestResponseProcessors:
+
+    def test_market_mask(self):
+        mask = MarketMask.from_list(['AD', 'DE', 'US'])
+        assert 'DE' in mask and 'FR' not in mask
+        assert len(mask) == 3
+        assert mask.to_list() == ['AD', 'DE', 'US']
+
+    def test_market_compactor(self):
+        response = {'tracks': [{'available_markets': ['DE', 'US'], 'album': {'available_markets': ['DE']}}]}
+        response = MarketCompactor()(response)
+        assert isinstance(response['tracks'][0]['available_markets'], MarketMask)
+        assert response['tracks'][0]['album']['available_markets'].to_list() == ['DE']
+
+    @pytest.mark.asyncio
+    async def test_compact_markets_request(self, prepared_api: SpotifyApiClient):
+        prepared_api._api_request_handler.response_processors = [MarketCompactor()]
+        album = await prepared_api.albums.get_one('03dlqdFWY9gwJxGl3AREVy')
+        assert isinstance(album['available_markets'], MarketMask)
+
+    def test_projection(self):
+        projection = Projection(['id', 'items.track.id'])
+        response = {'id': '1', 'name': 'n', 'next': 'url', 'items': [{'added_at': 'now', 'track': {'id': '2'}}]}
+        assert projection(response) == {'id': '1', 'next': 'url', 'items': [{'track': {'id': '2'}}]}
+        assert projection.fields() == 'id,items(track(id))'
+
+    @pytest.mark.asyncio
+    async def test_projection_request(self, prepared_api: SpotifyApiClient):
+        with Projection(['id', 'name']).active():
+            album = await prepared_api.albums.get_one('03dlqdFWY9gwJxGl3AREVy')
+        assert set(album.keys()) == {'id', 'name'}
+
+    @pytest.mark.asyncio
+    async def test_projection_override(self, prepared_api: SpotifyApiClient):
+        prepared_api._api_request_handler.response_processors = [Projection(['id'])]
+        with Projection(['name']).active():
+            album = await prepared_api.albums.get_one('03dlqdFWY9gwJxGl3AREVy')
+        assert set(album.keys()) == {'name'}
+
+    @pytest.mark.asyncio
+    async def test_projection_paging_helper(self, prepared_api: SpotifyApiClient):
+        prepared_api._api_request_handler.response_processors = [Projection(['id'])]
+        items, requests = await Endpoint._get_all_items(prepared_api.albums.get_tracks, '03dlqdFWY9gwJxGl3AREVy',
+                                                        limit=5)
+        assert requests > 1 and len(items) > 5
+        assert 'name' in items[0]
+
+    def test_entity_store(self):
+        store = EntityStore()
+        artist = {'id': '1', 'type': 'artist', 'uri': 'spotify:artist:1'}
+        first = store({'tracks': [{'id': '2', 'type': 'track', 'artists': [dict(artist)]}]})
+        second = store({'items': [{'track': {'id': '3', 'type': 'track', 'artists': [dict(artist)]}}]})
+        assert first['tracks'][0]['artists'][0] is second['items'][0]['track']['artists'][0]
+        assert store.get('track', '3') is second['items'][0]['track']
+        assert len(store) == 3
+
+    def test_entity_store_versions(self):
+        store = EntityStore()
+        full = store({'id': '1', 'type': 'album', 'name': 'n', 'label': 'l'})
+        first = store({'items': [{'id': '1', 'type': 'album', 'name': 'n'}]})['items'][0]
+        second = store({'items': [{'id': '1', 'type': 'album', 'name': 'n'}]})['items'][0]
+        assert first is second and store.shared == 1
+        assert store.get('album', '1') is full and len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_entity_store_request(self, prepared_api: SpotifyApiClient):
+        store = EntityStore()
+        prepared_api._api_request_handler.response_processors = [store]
+        tracks = await prepared_api.albums.get_tracks('03dlqdFWY9gwJxGl3AREVy')
+        artists = [track['artists'][0] for track in tracks['items']]
+        assert all(artist is artists[0] for artist in artists)
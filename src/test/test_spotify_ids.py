@@ -0,0 +1,77 @@
+"""
+Test the compact spotify ids
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_spotify_ids.py) is part of AsyncSpotify which is released under MIT.            #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import json
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.spotify_errors import SpotifyError
+from async_spotify.spotify_ids import SpotifyId, IdSet, IdMap, parse_spotify_reference
+
+
+class TestSpotifyIds:
+
+    def test_round_trip(self):
+        spotify_id = SpotifyId('7FIWs0pqAYbP91WWM0vlTQ')
+        assert str(spotify_id) == '7FIWs0pqAYbP91WWM0vlTQ'
+        assert f'{spotify_id}' == '7FIWs0pqAYbP91WWM0vlTQ'
+        assert SpotifyId(int(spotify_id)) == spotify_id
+        assert spotify_id.to_uri('track') == 'spotify:track:7FIWs0pqAYbP91WWM0vlTQ'
+
+    def test_mixed_forms(self):
+        spotify_id = SpotifyId('7FIWs0pqAYbP91WWM0vlTQ')
+        assert spotify_id == '7FIWs0pqAYbP91WWM0vlTQ' and not spotify_id != '7FIWs0pqAYbP91WWM0vlTQ'
+        assert spotify_id != '03dlqdFWY9gwJxGl3AREVy' and spotify_id != int(spotify_id)
+
+        assert spotify_id in {'7FIWs0pqAYbP91WWM0vlTQ'}
+        assert {spotify_id: 1}['7FIWs0pqAYbP91WWM0vlTQ'] == 1
+        assert len({spotify_id, '7FIWs0pqAYbP91WWM0vlTQ'}) == 1
+
+        assert json.loads(json.dumps([str(spotify_id)])) == [spotify_id]
+
+    def test_parse(self):
+        assert parse_spotify_reference('spotify:album:03dlqdFWY9gwJxGl3AREVy') == \
+               ('album', SpotifyId('03dlqdFWY9gwJxGl3AREVy'))
+        assert parse_spotify_reference('https://open.spotify.com/album/03dlqdFWY9gwJxGl3AREVy?si=1') == \
+               ('album', SpotifyId('03dlqdFWY9gwJxGl3AREVy'))
+
+        with pytest.raises(SpotifyError):
+            SpotifyId('invalid')
+
+    def test_id_set(self):
+        id_set = IdSet(['7FIWs0pqAYbP91WWM0vlTQ', 'spotify:track:7lQ8MOhq6IN2w8EYcFNSUk'], buffer_size=1)
+        assert '7FIWs0pqAYbP91WWM0vlTQ' in id_set and len(id_set) == 2
+        assert id_set.contains_many(['7lQ8MOhq6IN2w8EYcFNSUk', '03dlqdFWY9gwJxGl3AREVy']).tolist() == [True, False]
+
+    def test_id_map(self):
+        id_map = IdMap()
+        id_map['7FIWs0pqAYbP91WWM0vlTQ'] = 1
+        id_map['7FIWs0pqAYbP91WWM0vlTQ'] = 2
+        assert id_map['7FIWs0pqAYbP91WWM0vlTQ'] == 2 and len(id_map) == 1
+        assert id_map.get('03dlqdFWY9gwJxGl3AREVy') is None
+
+    def test_id_map_merge(self):
+        id_list = [SpotifyId(value * 7919) for value in range(1000)]
+        id_map = IdMap(buffer_size=16)
+        for index, spotify_id in enumerate(id_list):
+            id_map[spotify_id] = index
+        for index, spotify_id in enumerate(id_list[::3]):
+            id_map[spotify_id] = -index
+
+        assert len(id_map) == 1000 and [key for key, _ in id_map.items()] == sorted(id_list)
+        assert id_map[id_list[3]] == -1 and id_map[id_list[4]] == 4
+        assert len(IdSet(id_list + id_list[::2], buffer_size=16)) == 1000
+
+    @pytest.mark.asyncio
+    async def test_compact_id_request(self, prepared_api: SpotifyApiClient):
+        album = await prepared_api.albums.get_one(SpotifyId('03dlqdFWY9gwJxGl3AREVy'))
+        assert album['id'] == '03dlqdFWY9gwJxGl3AREVy'
@@ -0,0 +1,60 @@
+"""
+Test the coalescing of library and follow mutations
+"""
+
+# ##################################################################################################
+#  Copyright (c) 2020. niclashaderer                                                                     #
+#  This file (test_write_coalescer.py) is part of AsyncSpotify which is released under MIT.        #
+#  You are not allowed to use this code or this file for another project without                   #
+#  linking to the original source.                                                                 #
+# ##################################################################################################
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from async_spotify import SpotifyApiClient
+from async_spotify.tools import WriteCoalescer
+
+
+class TestWriteCoalescer:
+
+    @pytest.mark.asyncio
+    async def test_coalesce(self, prepared_api: SpotifyApiClient):
+        track_ids = ['3kW5Rq9AIL0QQuYTSKNkQw', '40YbWniIEmqy6s58fYXLUh', '7FIWs0pqAYbP91WWM0vlTQ']
+        coalescer = WriteCoalescer(prepared_api)
+
+        await asyncio.gather(*[coalescer.add_tracks([track_id]) for track_id in track_ids],
+                             coalescer.remove_tracks([track_ids[2]]),
+                             coalescer.follow_artist_or_user('artist', ['0OdUWJ0sBjDrqHygGUXeCF']))
+
+        assert coalescer.requests == 2
+        assert coalescer.cancelled == 2
+        assert await prepared_api.library.contains_tracks(track_ids[:2]) == [True, True]
+
+        await asyncio.gather(coalescer.remove_tracks(track_ids[:2]),
+                             coalescer.unfollow_artist_or_user('artist', ['0OdUWJ0sBjDrqHygGUXeCF']))
+        assert await prepared_api.library.contains_tracks(track_ids[:2]) == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_flush_order(self):
+        calls = []
+
+        class Library:
+            async def add_tracks(self, track_id_list, auth_token=None):
+                await asyncio.sleep(0.2)
+                calls.append(('add', track_id_list))
+
+            async def remove_tracks(self, track_id_list, auth_token=None):
+                calls.append(('remove', track_id_list))
+
+        coalescer = WriteCoalescer(SimpleNamespace(library=Library(), follow=None), window=0.01)
+
+        # The remove is buffered while the add is in flight, so it must not overtake it
+        added = coalescer.add_tracks(['3kW5Rq9AIL0QQuYTSKNkQw'])
+        await asyncio.sleep(0.1)
+        removed = coalescer.remove_tracks(['3kW5Rq9AIL0QQuYTSKNkQw'])
+
+        await asyncio.gather(added, removed)
+        assert calls == [('add', ['3kW5Rq9AIL0QQuYTSKNkQw']), ('remove', ['3kW5Rq9AIL0QQuYTSKNkQw'])]